@@ -2,60 +2,624 @@ import os
 import shutil
 import threading
 import time
-import queue
-import datetime
-from typing import List, Dict, Optional, Any
+import array
+import collections
+import functools
+import sys
+from typing import List, Dict, Optional, Iterator, Tuple
 import json
 import random
+import tempfile
+
+# Number of buffered log messages that triggers a write to console and file
+LOG_BATCH_SIZE = 64
+# Max time (in seconds) a log message stays buffered while others are logged
+LOG_FLUSH_INTERVAL = 0.1
+# Max number of buffered log messages; further messages are dropped (and
+# counted) until the buffer has been written out
+LOG_BUFFER_LIMIT = 4096
+# Number of appended sector rows after which a drive file is fully rewritten
+# (refreshing its metadata section)
+DRIVE_FILE_COMPACT_INTERVAL = 32
+# Max time (in seconds) sector writes may sit in memory before they are
+# flushed to the drive files
+DRIVE_FILE_FLUSH_INTERVAL = 0.1
+# Min time (in seconds) between checks that a drive's file still exists on
+# reads; deleting a drive file is noticed within this time
+DRIVE_FILE_CHECK_INTERVAL = 1.0
+# Pause (in seconds) after each simulated block write and rebuild step, so
+# the demo can be followed as it runs. Set RAIDVIS_DEMO_DELAY=0 to disable.
+# Malformed values fall back to the default and negative ones mean 0.
+try:
+    DEMO_DELAY = max(0.0, float(os.environ.get("RAIDVIS_DEMO_DELAY", "0.05")))
+except ValueError:
+    DEMO_DELAY = 0.05
+# Log every sector and logical block write (at DEBUG level) instead of one
+# summary per write_data() call. Set RAIDVIS_VERBOSE=1 to enable.
+VERBOSE_LOG = os.environ.get("RAIDVIS_VERBOSE", "0") not in ("", "0")
+# Severity order of log levels; messages below Logger.level_threshold are
+# dropped as soon as they are logged
+LOG_LEVELS = {"DEBUG": 0, "INFO": 1, "WARN": 2, "ERROR": 3}
+# Logical blocks written between config saves during one write_data() call;
+# the config is always saved once the call is done
+CONFIG_SAVE_INTERVAL = 32
+# Rebuild and rebalance log their progress this many times (about every 10%)
+PROGRESS_LOG_STEPS = 10
+# Bytes of payload stored per physical sector
+SECTOR_SIZE = 8
+# Block types a sector can hold; sectors store the index into this tuple
+BLOCK_TYPES = (
+    "DATA",
+    "PARITY",
+    "PARITY-P",
+    "PARITY-Q",
+    "REBUILT",
+    "SYNCED",
+    "PERM_LOST",
+    "REBUILD-FAIL",
+)
+_BLOCK_TYPE_CODES = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+
+# Drive file layout, kept as bytes so files can be assembled without
+# re-encoding the fixed parts. The header template is filled in with
+# str.format() (see Drive._header_bytes), the counters with %-formatting.
+_DRIVE_FILE_BANNER = "=" * 50
+_DRIVE_HEADER_TMPL = (
+    f"{_DRIVE_FILE_BANNER}\n"
+    "RAID DRIVE {drive_id} - DEMONSTRATION FILE\n"
+    f"{_DRIVE_FILE_BANNER}\n\n"
+    "METADATA:\n"
+    "Drive ID: {drive_id}\n"
+    "Status: {status}\n"
+    "Created: {created}\n"
+    "Signature: {signature}\n"
+)
+_DRIVE_PLACEHOLDERS = (
+    b"Part of RAID: [Will be updated]\n"
+    b"Position in RAID: [Will be updated]\n"
+    b"Rebuild Rate: N/A\n\n"
+)
+_DRIVE_COUNTERS_TMPL = (
+    b"Used Sectors: %d\n"
+    b"Next Physical Sector: %d\n\n"
+)
+# Closing line of the block diagram
+_TABLE_BORDER = b"+--------+--------+--------+--------+\n"
+_BLOCK_DIAGRAM_HEADER = (
+    b"BLOCK DIAGRAM:\n"
+    + _TABLE_BORDER
+    + b"| Sector | LBlock | Type   | Data   |\n"
+    + _TABLE_BORDER
+)
+# Block diagram rows, for sectors with and without a logical block address.
+# %-formatting a prebuilt template is cheaper than an f-string per row.
+_SECTOR_ROW_TMPL = "|   %2d   | %6d | %-6s | %-6s |\n"
+_SECTOR_ROW_NO_LBA_TMPL = "|   %2d   |    N/A | %-6s | %-6s |\n"
+
+# Local time string cached for the current second (see _now_iso)
+_iso_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """
+    Returns the current local time in ISO 8601 format, to the second.
+    The string only changes once per second, so it is cached and reused
+    for every call within the same second (e.g. drives created together).
+    """
+    global _iso_cache
+    now = int(time.time())
+    if now != _iso_cache[0]:
+        _iso_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)))
+    return _iso_cache[1]
+
 
-# Global queue for logging messages to ensure thread-safe logging
-log_queue = queue.Queue()
-# Flag to control the logging thread's lifecycle
-logging_active = True
+@functools.lru_cache(maxsize=1024)
+def _sector_payload(data: str) -> Tuple[bytes, int]:
+    """
+    Returns `data` the way a sector holds it: UTF-8 encoded, cut to
+    SECTOR_SIZE bytes and NUL padded, along with its length before padding.
+    The same block is stored on every mirror and blocks repeat a lot, so
+    encodings are cached and shared.
+    """
+    raw = data.encode("utf-8")[:SECTOR_SIZE]
+    return raw.ljust(SECTOR_SIZE, b"\0"), len(raw)
+
+
+def _xor_chars(data: str) -> int:
+    """
+    Returns the XOR of the code points of all characters in `data`.
+    Longer Latin-1 strings are folded as one big integer, halving its width
+    until a single byte is left, which keeps the work in C instead of a
+    Python-level loop per character.
+    """
+    if len(data) >= 64:
+        try:
+            raw = data.encode("latin-1")  # Code point == byte value
+        except UnicodeEncodeError:
+            pass
+        else:
+            value = int.from_bytes(raw, "big")
+            bits = (1 << (len(raw) - 1).bit_length()) * 8  # Zero-padded to 2**n bytes
+            while bits > 8:
+                bits >>= 1
+                value = (value >> bits) ^ (value & ((1 << bits) - 1))
+            return value
+
+    value = 0
+    for char in data:
+        value ^= ord(char)
+    return value
+
+
+# GF(2^8) exponent and logarithm tables for the RAID-6 Q parity, with
+# generator 2 and the polynomial x^8 + x^4 + x^3 + x^2 + 1 (0x11D), as used
+# by Linux md. _GF_EXP is doubled so exponents can be added without a modulo.
+_GF_EXP = bytearray(512)
+_GF_LOG = [0] * 256
+_gf_value = 1
+for _gf_power in range(255):
+    _GF_EXP[_gf_power] = _gf_value
+    _GF_LOG[_gf_value] = _gf_power
+    _gf_value <<= 1
+    if _gf_value & 0x100:
+        _gf_value ^= 0x11D
+for _gf_power in range(255, 512):
+    _GF_EXP[_gf_power] = _GF_EXP[_gf_power - 255]
+del _gf_value, _gf_power
+
+
+def _q_parity(data: str, lba: int) -> str:
+    """
+    Returns the RAID-6 Q parity block of a one-character logical block:
+    the character's byte value multiplied in GF(2^8) by g**(lba % 255),
+    formatted as Qxxx. Unlike XOR parity, the result always fits in a byte
+    and can be inverted (see _q_recover) without the P block. Since Q holds
+    a single byte, only characters up to U+00FF (Latin-1) can be recovered;
+    higher code points keep just their low byte and alias (e.g. 'Ā' and
+    '\0' both give Q000).
+    """
+    value = ord(data) & 0xFF if data else 0
+    if value:
+        value = _GF_EXP[_GF_LOG[value] + lba % 255]
+    return f"Q{value:03d}"
+
+
+def _q_recover(q_block: str, lba: int) -> str:
+    """Returns the character a Q parity block made by _q_parity was computed from."""
+    value = int(q_block[1:]) & 0xFF
+    if value:
+        value = _GF_EXP[_GF_LOG[value] + 255 - lba % 255]
+    return chr(value)
+
+
+def _data_drive_index(lba: int, num_drives: int, parity_indices: Tuple[int, ...]) -> int:
+    """
+    Returns the index (among `num_drives` drives) of the drive that holds
+    the data block of `lba` in a parity stripe: the (lba % number of data
+    drives)-th drive that is not a parity drive. Equivalent to building
+    the list of data drives and indexing it, without building the list.
+    """
+    index = lba % (num_drives - len(parity_indices))
+    for parity_index in sorted(parity_indices):
+        if index >= parity_index:
+            index += 1  # Skip over the parity drive
+    return index
+
+
+def _write_all(fd: int, data: bytes):
+    """Writes all of `data` to `fd`, looping in case of a partial write."""
+    while data:
+        data = data[os.write(fd, data):]
 
 
 class Logger:
     """
     Handles system logging to both the console and a file.
     This class ensures all messages are timestamped and categorized
-    (INFO, WARN, ERROR) for better traceability.
+    (DEBUG, INFO, WARN, ERROR) for better traceability. DEBUG messages
+    are only kept when RAIDVIS_VERBOSE is set.
+    Messages are buffered and written out in batches by whichever thread
+    logs them, so there is no logging thread to hand them over to. Call
+    flush() before blocking (e.g. on user input) so nothing stays buffered.
+    The log file is only created once the first batch is written.
     """
 
     def __init__(self, log_file="system.log"):
         self.log_file = log_file
-        # Start a daemon thread for logging so it doesn't prevent program exit
-        self.log_thread = threading.Thread(target=self._logging_worker, daemon=True)
-        self.log_thread.start()
+        # Minimum LOG_LEVELS value of the messages that are kept
+        self.level_threshold = LOG_LEVELS["DEBUG" if VERBOSE_LOG else "INFO"]
+        # (second, timestamp string) cached for the current second (see
+        # _write_batch)
+        self._ts = (0, "")
+        # (second, level, message) tuples not written yet. deque.append/popleft
+        # are atomic, so logging threads add to it without taking a lock.
+        self._buf = collections.deque()
+        # Messages dropped because the buffer was full (see log())
+        self._dropped = 0
+        # Batches that could not be written to the console or the log file
+        # (e.g. disk full). They are dropped so logging never fails a caller.
+        self.write_errors = 0
+        # Held by the thread currently writing a batch out
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # Raw descriptor in append mode: each batch is one os.write() of
+        # pre-encoded bytes, with no text or buffering layer in between.
+        # Opened by the first _write_batch(), so a Logger that never logs
+        # (e.g. the module default when importing raidvis) creates no file.
+        self._fd: Optional[int] = None
+        # Set by shutdown(); later batches only go to the console
+        self._closed = False
 
     def log(self, message: str, level: str = "INFO"):
         """
-        Adds a message to the logging queue with a timestamp and level.
-        Messages are then processed by the logging worker thread.
+        Adds a message with its level and the current time to the log
+        buffer. Formatting is left to _write_batch, so logging costs the
+        caller little more than an append. The buffer is written out once
+        LOG_BATCH_SIZE messages are waiting or LOG_FLUSH_INTERVAL seconds
+        have passed since the last write. If LOG_BUFFER_LIMIT messages are
+        already waiting, the message is dropped and only counted.
+        Messages below level_threshold are dropped right away.
         """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        formatted_msg = f"[{timestamp}] {level}: {message}"
-        log_queue.put(formatted_msg)
+        if LOG_LEVELS.get(level, 1) < self.level_threshold:
+            return
+        if len(self._buf) >= LOG_BUFFER_LIMIT:
+            self._dropped += 1
+            return
+        self._buf.append((int(time.time()), level, message))
+        if (
+            len(self._buf) >= LOG_BATCH_SIZE
+            or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL
+        ):
+            # If another thread is already writing, don't wait for it: this
+            # message is written with its batch or the next one
+            self._flush(wait=False)
+
+    def flush(self):
+        """Writes out all buffered messages."""
+        self._flush(wait=True)
+
+    def shutdown(self):
+        """Writes out all buffered messages and closes the log file."""
+        with self._write_lock:
+            self._write_batch()
+            if self._fd is not None:
+                try:
+                    os.fsync(self._fd)
+                except OSError:
+                    pass
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
+            self._closed = True
+
+    def _flush(self, wait: bool):
+        """Writes out the buffer unless `wait` is False and a write is in progress."""
+        if not self._write_lock.acquire(blocking=wait):
+            return
+        try:
+            self._write_batch()
+        finally:
+            self._write_lock.release()
 
-    def _logging_worker(self):
+    def _write_batch(self):
         """
-        The main worker function for the logging thread.
-        It continuously pulls messages from the queue and writes them
-        to the console and the log file.
+        Formats the buffered messages and writes them to the console and the
+        log file in one go (one write() each). The formatted timestamp only
+        changes once per second, so it is cached and reused for every
+        message logged within the same second. Must be called with
+        _write_lock held. Write errors are counted in write_errors and the
+        output is dropped, since log() is called from RAID operations that
+        must not fail because of logging.
         """
-        with open(self.log_file, "a") as f:
-            while logging_active:
+        self._last_flush = time.monotonic()
+        # Only take what is queued now, so busy loggers can't keep us here
+        entries = [self._buf.popleft() for _ in range(len(self._buf))]
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            entries.append((int(time.time()), "WARN", f"[{dropped} log lines dropped]"))
+        if not entries:
+            return
+
+        batch = []
+        ts = self._ts
+        for sec, level, message in entries:
+            if sec != ts[0]:
+                ts = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)))
+            batch.append(f"[{ts[1]}] {level}: {message}")
+        self._ts = ts
+
+        console_lines = []
+        for message in batch:
+            if "WARN" in message:
+                console_lines.append(f"\033[93m{message}\033[0m")  # Yellow for warnings
+            elif "ERROR" in message:
+                console_lines.append(f"\033[91m{message}\033[0m")  # Red for errors
+            else:
+                console_lines.append(message)  # Default color for info
+        try:
+            self._write_console("\n".join(console_lines) + "\n")
+        except (OSError, ValueError):  # ValueError: stdout closed
+            self.write_errors += 1
+
+        if self._fd is None and not self._closed:
+            try:
+                self._fd = os.open(
+                    self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+                )
+            except OSError:
+                self.write_errors += 1  # Retried with the next batch
+        if self._fd is not None:
+            try:
+                # One write for the whole batch
+                _write_all(self._fd, ("\n".join(batch) + "\n").encode("utf-8", "replace"))
+            except OSError:
+                self.write_errors += 1
+
+    def _write_console(self, text: str):
+        """
+        Writes a batch of console output with a single os.write() on the
+        console's file descriptor, skipping sys.stdout's text layer.
+        Anything other threads have already print()ed into sys.stdout's
+        buffer is flushed first so the output stays in order.
+        """
+        sys.stdout.flush()
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            # Not backed by a real file (e.g. replaced by an in-memory stream)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        _write_all(fd, text.encode(sys.stdout.encoding or "utf-8", "replace"))
+
+
+# Shared logger used by the whole module (writes to system.log in the
+# current directory)
+logger = Logger()
+
+
+class DriveWriter:
+    """
+    Applies drive file writes on a background thread so RAID operations
+    don't block on file I/O. All writes go through one FIFO queue, so the
+    writes for any given file are applied in the order they were submitted.
+    Drives with unwritten sector rows are marked dirty and flushed by the
+    thread DRIVE_FILE_FLUSH_INTERVAL seconds after the first of them was
+    marked, so a burst of sector writes costs one file update instead of
+    one per sector. While nothing is dirty or queued the thread sleeps
+    without waking up.
+    The thread is only started on the first submitted write.
+    """
+
+    def __init__(self):
+        self._queue = collections.deque()
+        self._event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._dirty: set = set()  # Drives with changes not yet in their file
+        self._dirty_since = 0.0  # time.monotonic() when _dirty became non-empty
+        self._dirty_lock = threading.Lock()
+
+    def mark_dirty(self, drive: "Drive"):
+        """Schedules `drive` to have its file brought up to date on the next flush."""
+        with self._dirty_lock:
+            was_clean = not self._dirty
+            if was_clean:
+                self._dirty_since = time.monotonic()
+            self._dirty.add(drive)
+        if self._thread is None:
+            self._start()
+        elif was_clean:
+            # Wake the thread so it starts timing the flush
+            self._event.set()
+
+    def flush_dirty(self):
+        """Brings the files of all drives marked dirty up to date."""
+        with self._dirty_lock:
+            drives, self._dirty = self._dirty, set()
+        for drive in drives:
+            drive.flush_file()
+
+    def submit(
+        self,
+        fd: int,
+        data: bytes,
+        offset: int,
+        truncate: bool = False,
+        drive: Optional["Drive"] = None,
+    ):
+        """
+        Queues a write of `data` at `offset` in the file `fd`. With
+        `truncate`, the file is cut to end right after the written data.
+        If the write fails, `drive` (the owner of `fd`) is told so through
+        file_write_failed().
+        """
+        self._queue.append((fd, data, offset, truncate, drive))
+        self._event.set()
+        if self._thread is None:
+            self._start()
+
+    def flush(self):
+        """
+        Flushes all dirty drives, then blocks until every write submitted so
+        far has been applied.
+        """
+        if self._thread is None:
+            return
+        self.flush_dirty()
+        done = threading.Event()
+        self._queue.append(done)
+        self._event.set()
+        # Checked periodically so a writer thread that died can't hang us
+        while not done.wait(timeout=1.0):
+            if not self._thread.is_alive():
+                logger.log("Drive file writer is not running; writes may be lost.", "ERROR")
+                return
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer_worker, daemon=True)
+                self._thread.start()
+
+    def _writer_worker(self):
+        """
+        Applies queued writes batch by batch (see _write_batch) for the
+        lifetime of the program. An unexpected error only loses the batch it
+        happened in; the thread keeps running so flush() is never left
+        waiting for a dead writer.
+        """
+        while True:
+            batch = []
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Keep the thread alive: flush() waits on it
                 try:
-                    message = log_queue.get(timeout=0.1)  # Wait briefly for messages
-                    if "WARN" in message:
-                        print(f"\033[93m{message}\033[0m")  # Yellow for warnings
-                    elif "ERROR" in message:
-                        print(f"\033[91m{message}\033[0m")  # Red for errors
-                    else:
-                        print(message)  # Default color for info
-                    f.write(message + "\n")  # Write to file
-                    f.flush()  # Ensure it's written to disk immediately
-                except queue.Empty:
-                    continue  # No messages, just check again
+                    logger.log(f"Unexpected error in drive file writer: {e}", "ERROR")
+                except Exception:
+                    pass
+            finally:
+                # Release any flush() callers whose marker was taken, even if
+                # the batch failed part way
+                for op in batch:
+                    if isinstance(op, threading.Event):
+                        op.set()
+
+    def _write_batch(self, batch: list):
+        """
+        Waits for work, flushes dirty drives when due and applies the queued
+        writes, collecting them in `batch` (so the caller can release any
+        flush() markers in it if something goes wrong). Within a batch, a
+        full rewrite of a file makes any earlier writes to that file
+        redundant, so those are skipped.
+        """
+        with self._dirty_lock:
+            if self._dirty:
+                timeout = self._dirty_since + DRIVE_FILE_FLUSH_INTERVAL - time.monotonic()
+            else:
+                timeout = None  # Nothing to flush; sleep until woken
+        if timeout is None or timeout > 0:
+            self._event.wait(timeout)
+        self._event.clear()
+        with self._dirty_lock:
+            due = bool(self._dirty) and time.monotonic() - self._dirty_since >= DRIVE_FILE_FLUSH_INTERVAL
+        if due:
+            try:
+                self.flush_dirty()
+            except Exception as e:
+                logger.log(f"Error flushing drive files: {e}", "ERROR")
+        while self._queue:
+            batch.append(self._queue.popleft())
+
+        # Walk backwards to find writes superseded by a later full rewrite.
+        # flush() markers act as barriers so nothing before them is skipped.
+        skip = set()
+        rewritten_later = set()
+        for i in range(len(batch) - 1, -1, -1):
+            op = batch[i]
+            if isinstance(op, threading.Event):
+                rewritten_later = set()
+            elif op[0] in rewritten_later:
+                skip.add(i)
+            elif op[2] == 0 and op[3]:
+                rewritten_later.add(op[0])
+
+        for i, op in enumerate(batch):
+            if isinstance(op, threading.Event):
+                op.set()  # A flush() marker: everything before it is written
+                continue
+            fd, data, offset, truncate, drive = op
+            if i in skip:
+                continue  # Overwritten later in this batch anyway
+            try:
+                os.pwrite(fd, data, offset)
+                if truncate:
+                    os.ftruncate(fd, offset + len(data))
+            except OSError as e:
+                logger.log(f"Error writing drive file (fd {fd}): {e}", "ERROR")
+                logger.flush()
+                if drive is not None:
+                    drive.file_write_failed()
+
+
+# Shared background writer used by all drives
+drive_writer = DriveWriter()
+
+
+# ---------------------------------------------------------------------
+# Sector storage
+# ---------------------------------------------------------------------
+class SectorStore:
+    """
+    Holds the sectors of a single drive as parallel arrays indexed by
+    physical sector number (payload bytes, block type code and LBA)
+    instead of one small dict per sector.
+    Supports `in`, `len()`, indexing and iteration in sector order.
+    """
+
+    def __init__(self):
+        self._data = bytearray()  # SECTOR_SIZE bytes per sector, NUL padded
+        self._types = array.array("b")  # Index into BLOCK_TYPES, -1 = unused sector
+        self._lbas = array.array("q")  # Logical block address, -1 = none
+        # Payload length in bytes, so NULs that are part of the data aren't
+        # mistaken for padding
+        self._lens = array.array("B")
+        self._used = 0
+
+    def __len__(self) -> int:
+        return self._used
+
+    def __contains__(self, sector_num: int) -> bool:
+        return 0 <= sector_num < len(self._types) and self._types[sector_num] >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the numbers of all used sectors in ascending order."""
+        if self._used == len(self._types):
+            return iter(range(self._used))  # No gaps, the usual case
+        return (n for n, type_code in enumerate(self._types) if type_code >= 0)
+
+    def __getitem__(self, sector_num: int) -> Tuple[str, str, Optional[int]]:
+        """Returns (data, block_type, lba) for a used sector."""
+        data = self.data_of(sector_num)  # Raises KeyError for unused sectors
+        lba = self._lbas[sector_num]
+        return data, BLOCK_TYPES[self._types[sector_num]], lba if lba >= 0 else None
+
+    def data_of(self, sector_num: int) -> str:
+        """Returns just the payload of a used sector."""
+        if sector_num not in self:
+            raise KeyError(sector_num)
+        offset = sector_num * SECTOR_SIZE
+        data = self._data[offset : offset + self._lens[sector_num]]
+        return data.decode("utf-8", "ignore")
+
+    def type_of(self, sector_num: int) -> str:
+        """Returns just the block type of a used sector."""
+        if sector_num not in self:
+            raise KeyError(sector_num)
+        return BLOCK_TYPES[self._types[sector_num]]
+
+    def store(self, sector_num: int, data: str, block_type: str, lba: Optional[int]):
+        """
+        Stores a sector, growing the arrays if `sector_num` is past the end.
+        Data longer than SECTOR_SIZE bytes is truncated, as on a real sector.
+        """
+        missing = sector_num + 1 - len(self._types)
+        if missing > 0:
+            self._types.extend([-1] * missing)
+            self._lbas.extend([-1] * missing)
+            self._lens.extend(bytes(missing))
+            self._data.extend(bytes(missing * SECTOR_SIZE))
+        if self._types[sector_num] < 0:
+            self._used += 1
+
+        offset = sector_num * SECTOR_SIZE
+        payload, self._lens[sector_num] = _sector_payload(data)
+        self._data[offset : offset + SECTOR_SIZE] = payload
+        self._types[sector_num] = _BLOCK_TYPE_CODES[block_type]
+        self._lbas[sector_num] = -1 if lba is None else lba
 
 
 # ------------------------------------------
@@ -67,6 +631,9 @@ class Drive:
     Each drive manages its own sectors and metadata.
     """
 
+    # Bumped whenever any drive's is_active changes (see RAIDArray.active_drives)
+    _status_generation = 0
+
     def __init__(
         self, drive_id: int, folder_path: str, signature: Optional[str] = None
     ):
@@ -74,49 +641,69 @@ class Drive:
         self.folder_path = folder_path
         self.file_path = os.path.join(folder_path, f"disk_{drive_id}")
         self.is_active = True  # Indicates if the drive is operational
-        # Dictionary to store sector data: physical_sector_number -> {data, type, lba}
-        self.sectors: Dict[int, Dict[str, Any]] = {}
+        # Sector data, type and LBA, indexed by physical sector number
+        self.sectors = SectorStore()
         self.next_physical_sector = 0  # Counter for the next available physical sector
+        # Rows appended to the drive file since its last full rewrite
+        self._appends_since_rewrite = 0
+        # Rows can only be appended once _update_file has laid out the table
+        self._rows_appendable = False
+        # Sectors written since the last flush whose rows go at the end of the
+        # table, and whether some other change needs the whole file rewritten
+        self._pending_rows: List[int] = []
+        self._needs_rewrite = False
+        # Encoded block diagram rows by sector number (None = not formatted
+        # yet), so a full rewrite doesn't reformat every row
+        self._row_cache: List[Optional[bytes]] = []
+        # Guards the file state above, which the writer thread also updates
+        self._file_lock = threading.RLock()
+        # (fields, encoded header) of the last header built (see _header_bytes)
+        self._header_cache: Optional[Tuple[tuple, bytes]] = None
+        # The drive file stays open for the drive's lifetime (see _open_file)
+        self._fd: Optional[int] = None
+        self._file_size = 0
+        # time.monotonic() of the last check that the file exists (see read_sector)
+        self._file_checked_at = 0.0
 
         # A unique signature helps identify a drive, especially during rebuilds
         self.signature = (
             signature
             if signature
-            else f"DRV-{drive_id}-{random.randint(10000,99999)}-{datetime.datetime.now().timestamp()}"
+            else f"DRV-{drive_id}-{random.randint(10000,99999)}-{time.time()}"
         )
 
         self.metadata = {
             "drive_id": drive_id,
-            "creation_time": datetime.datetime.now().isoformat(),
+            "creation_time": _now_iso(),
             "status": "active",  # Current operational status
             "total_sectors": 0,  # Max sectors (not implemented for dynamic demo)
-            "used_sectors": 0,
+            # The used sector count is kept by the SectorStore: len(self.sectors)
             "signature": self.signature,
         }
         self.create_drive_file()  # Create the physical file representation
 
+    @property
+    def is_active(self) -> bool:
+        """Indicates if the drive is operational."""
+        return self._is_active
+
+    @is_active.setter
+    def is_active(self, value: bool):
+        self._is_active = value
+        Drive._status_generation += 1
+
     def create_drive_file(self):
         """
         Initializes the drive's representation file on disk with a header
         and metadata. This makes the simulated drive's content visible.
         """
+        contents = (
+            self._header_bytes()
+            + _DRIVE_PLACEHOLDERS
+            + _BLOCK_DIAGRAM_HEADER
+        )
         try:
-            with open(self.file_path, "w") as f:
-                f.write(f"{'='*50}\n")
-                f.write(f"RAID DRIVE {self.drive_id} - DEMONSTRATION FILE\n")
-                f.write(f"{'='*50}\n\n")
-                f.write("METADATA:\n")
-                f.write(f"Drive ID: {self.drive_id}\n")
-                f.write(f"Status: {self.metadata['status']}\n")
-                f.write(f"Created: {self.metadata['creation_time']}\n")
-                f.write(f"Signature: {self.signature}\n")
-                f.write(f"Part of RAID: [Will be updated]\n")  # Placeholder
-                f.write(f"Position in RAID: [Will be updated]\n")  # Placeholder
-                f.write(f"Rebuild Rate: N/A\n\n")  # Placeholder
-                f.write("BLOCK DIAGRAM:\n")
-                f.write("+--------+--------+--------+--------+\n")
-                f.write("| Sector | LBlock | Type   | Data   |\n")
-                f.write("+--------+--------+--------+--------+\n")
+            self._rewrite_file(contents)
         except Exception as e:
             logger.log(f"Error creating drive file {self.file_path}: {e}", "ERROR")
 
@@ -126,23 +713,35 @@ class Drive:
         """
         Writes data to the next available physical sector on this drive.
         Associates the data with a Logical Block Address (LBA) if provided.
+        Raises an exception if the drive is not active.
         """
-        if not self.is_active:
+        current_physical_sector = self.try_write_sector(data, block_type, lba)
+        if current_physical_sector is None:
             raise Exception(f"Drive {self.drive_id} is not active")
+        return current_physical_sector
 
-        current_physical_sector = self.next_physical_sector
-        self.sectors[current_physical_sector] = {
-            "data": data,
-            "type": block_type,
-            "lba": lba,
-        }
-        self.metadata["used_sectors"] = len(self.sectors)
-        self.next_physical_sector += 1
+    def try_write_sector(
+        self, data: str, block_type: str = "DATA", lba: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Like write_sector, but returns None instead of raising if the drive
+        is not active, for loops that can simply skip failed drives.
+        """
+        if not self.is_active:
+            return None
 
-        self._update_file()  # Update the on-disk file representation
-        logger.log(
-            f"Drive {self.drive_id}: Written '{data}' to physical sector {current_physical_sector} (LBA: {lba if lba is not None else 'N/A'}) as {block_type}"
-        )
+        with self._file_lock:
+            current_physical_sector = self.next_physical_sector
+            self.sectors.store(current_physical_sector, data, block_type, lba)
+            self._invalidate_row(current_physical_sector)
+            self.next_physical_sector += 1
+            self._pending_rows.append(current_physical_sector)
+        drive_writer.mark_dirty(self)  # The file is updated on the next flush
+        if VERBOSE_LOG:
+            logger.log(
+                f"Drive {self.drive_id}: Written '{data}' to physical sector {current_physical_sector} (LBA: {lba if lba is not None else 'N/A'}) as {block_type}",
+                "DEBUG",
+            )
         return current_physical_sector
 
     def write_to_specific_sector(
@@ -155,40 +754,79 @@ class Drive:
         """
         Writes data to a specific physical sector. This is primarily used
         during rebuild operations to precisely place reconstructed data.
+        Raises an exception if the drive is not active.
         """
-        if not self.is_active:
+        if not self.try_write_to_specific_sector(sector_num, data, block_type, lba):
             raise Exception(f"Drive {self.drive_id} is not active")
 
-        self.sectors[sector_num] = {"data": data, "type": block_type, "lba": lba}
-        self.metadata["used_sectors"] = len(self.sectors)
-        # Make sure next_physical_sector is at least this sector + 1
-        if sector_num >= self.next_physical_sector:
-            self.next_physical_sector = sector_num + 1
-        self._update_file()
-        logger.log(
-            f"Drive {self.drive_id}: (WriteSpecific) '{data}' to physical sector {sector_num} (LBA: {lba if lba is not None else 'N/A'}) as {block_type}"
-        )
+    def try_write_to_specific_sector(
+        self,
+        sector_num: int,
+        data: str,
+        block_type: str = "DATA",
+        lba: Optional[int] = None,
+    ) -> bool:
+        """
+        Like write_to_specific_sector, but returns False instead of raising
+        if the drive is not active. Used by the rebuild loop.
+        """
+        if not self.is_active:
+            return False
+
+        with self._file_lock:
+            self.sectors.store(sector_num, data, block_type, lba)
+            self._invalidate_row(sector_num)
+            # Make sure next_physical_sector is at least this sector + 1
+            if sector_num >= self.next_physical_sector:
+                self.next_physical_sector = sector_num + 1
+                # New sector at the end of the table, so its row can just be appended
+                self._pending_rows.append(sector_num)
+            else:
+                # Overwrites or out-of-order sectors need the table re-sorted
+                self._needs_rewrite = True
+        drive_writer.mark_dirty(self)
+        if VERBOSE_LOG:
+            logger.log(
+                f"Drive {self.drive_id}: (WriteSpecific) '{data}' to physical sector {sector_num} (LBA: {lba if lba is not None else 'N/A'}) as {block_type}",
+                "DEBUG",
+            )
+        return True
 
     def read_sector(self, sector: int) -> Optional[str]:
         """
         Reads and returns data from a specific physical sector.
-        Handles cases where the drive is failed or the file is missing.
+        Handles cases where the drive is failed or the file is missing. The
+        file is looked up at most every DRIVE_FILE_CHECK_INTERVAL seconds, so
+        reads in a loop (e.g. a rebuild) don't each cost a stat() call.
         """
         if not self.is_active:
             logger.log(f"Attempted read from failed drive {self.drive_id}", "ERROR")
             return None
 
-        if not os.path.exists(self.file_path):
-            logger.log(
-                f"Drive {self.drive_id} file not found. Marking as failed.", "ERROR"
-            )
-            self.mark_failed()
-            return None
+        now = time.monotonic()
+        if now - self._file_checked_at >= DRIVE_FILE_CHECK_INTERVAL:
+            if not os.path.exists(self.file_path):
+                logger.log(
+                    f"Drive {self.drive_id} file not found. Marking as failed.", "ERROR"
+                )
+                self.mark_failed()
+                return None
+            self._file_checked_at = now
 
         if sector in self.sectors:
-            return self.sectors[sector]["data"]
+            return self.sectors.data_of(sector)
         return None
 
+    def clear_sectors(self):
+        """Discards all sectors so the drive can be written from scratch."""
+        with self._file_lock:
+            self.sectors = SectorStore()
+            self.next_physical_sector = 0
+            self._pending_rows = []
+            self._row_cache = []
+            self._needs_rewrite = True
+        drive_writer.mark_dirty(self)
+
     def mark_failed(self):
         """Marks the drive as failed, making it inactive for I/O operations."""
         self.is_active = False
@@ -196,56 +834,174 @@ class Drive:
         logger.log(f"Drive {self.drive_id}: DRIVE FAILURE DETECTED", "ERROR")
         self._update_file()
 
+    def _open_file(self) -> int:
+        """
+        Returns the descriptor of the drive's file, opening (and creating)
+        it on first use. Keeping it open avoids an open()/close() pair on
+        every update.
+        """
+        if self._fd is None:
+            self._fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _rewrite_file(self, contents: bytes):
+        """Replaces the whole content of the drive's file with `contents`."""
+        with self._file_lock:
+            drive_writer.submit(
+                self._open_file(), contents, 0, truncate=True, drive=self
+            )
+            self._file_size = len(contents)
+
+    def file_write_failed(self):
+        """
+        Called by the writer thread when a write to the drive's file failed.
+        The file size and appended rows tracked here no longer match the
+        file, so the next flush rewrites it in full instead of appending.
+        """
+        with self._file_lock:
+            self._needs_rewrite = True
+
+    def refresh_file(self):
+        """
+        Rewrites the drive's file if rows were appended to it since it was
+        last written in full, so that its metadata section (sector counts)
+        is current. Appends leave that section alone, so this is done
+        before the file is shown or closed rather than on every write.
+        """
+        with self._file_lock:
+            if self._appends_since_rewrite or self._pending_rows or self._needs_rewrite:
+                self._update_file()
+
+    def close(self):
+        """
+        Closes the drive's file descriptor, if it is open, once its metadata
+        is refreshed and all of its queued writes have been applied.
+        """
+        if self._fd is not None:
+            self.refresh_file()
+            drive_writer.flush()
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def _header_bytes(self) -> bytes:
+        """
+        Returns the encoded banner and metadata lines of the drive's file.
+        These rarely change (in practice only the status does), so the header
+        is formatted once and reused until one of its fields changes.
+        """
+        fields = (
+            self.drive_id,
+            self.metadata["status"],
+            self.metadata["creation_time"],
+            self.signature,
+        )
+        if self._header_cache is None or self._header_cache[0] != fields:
+            header = _DRIVE_HEADER_TMPL.format(
+                drive_id=fields[0],
+                status=fields[1],
+                created=fields[2],
+                signature=fields[3],
+            )
+            self._header_cache = (fields, header.encode())
+        return self._header_cache[1]
+
+    def _format_sector_row(self, sector_num: int) -> str:
+        """Formats the block diagram row for a single physical sector."""
+        data, block_type, lba = self.sectors[sector_num]
+        # Show a preview of data, truncating if too long
+        data_preview = data[:8] if len(data) > 8 else data
+        if lba is None:
+            return _SECTOR_ROW_NO_LBA_TMPL % (sector_num, block_type, data_preview)
+        return _SECTOR_ROW_TMPL % (sector_num, lba, block_type, data_preview)
+
+    def _sector_row(self, sector_num: int) -> bytes:
+        """Returns the encoded block diagram row of a sector, formatting it once."""
+        cache = self._row_cache
+        if sector_num >= len(cache):
+            cache.extend([None] * (sector_num + 1 - len(cache)))
+        row = cache[sector_num]
+        if row is None:
+            row = cache[sector_num] = self._format_sector_row(sector_num).encode()
+        return row
+
+    def _invalidate_row(self, sector_num: int):
+        """Drops the cached row of a sector whose contents changed."""
+        if sector_num < len(self._row_cache):
+            self._row_cache[sector_num] = None
+
+    def flush_file(self):
+        """
+        Brings the drive's file up to date with the sectors written since the
+        last flush. Rows of new sectors are appended with a single write: the
+        closing border of the block diagram is overwritten by the new rows and
+        written again after them, so the file stays well-formed. The whole file
+        is rewritten instead if some other change was made, or once
+        DRIVE_FILE_COMPACT_INTERVAL rows have been appended (to refresh its
+        metadata section).
+        """
+        with self._file_lock:
+            if not self._pending_rows and not self._needs_rewrite:
+                return
+            if (
+                self._needs_rewrite
+                or not self._rows_appendable
+                or self._appends_since_rewrite >= DRIVE_FILE_COMPACT_INTERVAL
+            ):
+                self._update_file()
+                return
+
+            pending, self._pending_rows = self._pending_rows, []
+            rows = b"".join([self._sector_row(n) for n in pending])
+            border = _TABLE_BORDER
+            try:
+                drive_writer.submit(
+                    self._open_file(),
+                    rows + border,
+                    self._file_size - len(border),
+                    drive=self,
+                )
+                self._file_size += len(rows)
+                self._appends_since_rewrite += len(pending)
+            except Exception as e:
+                logger.log(f"Error appending to drive file {self.file_path}: {e}", "ERROR")
+
     def _update_file(self):
         """
         Rewrites the drive's file on disk to reflect its current state,
-        including metadata and the block diagram.
+        including metadata and the block diagram. Any rows still waiting
+        for a flush are included. The file lock is held throughout, so the
+        writer thread can't append rows between building the contents and
+        queueing them (the rewrite would truncate those rows away).
         """
-        try:
-            with open(self.file_path, "w") as f:
-                f.write(f"{'='*50}\n")
-                f.write(f"RAID DRIVE {self.drive_id} - DEMONSTRATION FILE\n")
-                f.write(f"{'='*50}\n\n")
-                f.write("METADATA:\n")
-                f.write(f"Drive ID: {self.drive_id}\n")
-                f.write(f"Status: {self.metadata['status']}\n")
-                f.write(f"Created: {self.metadata['creation_time']}\n")
-                f.write(f"Signature: {self.signature}\n")
-                f.write(f"Used Sectors: {self.metadata['used_sectors']}\n")
-                f.write(f"Next Physical Sector: {self.next_physical_sector}\n\n")
-                f.write("BLOCK DIAGRAM:\n")
-                f.write("+--------+--------+--------+--------+\n")
-                f.write("| Sector | LBlock | Type   | Data   |\n")
-                f.write("+--------+--------+--------+--------+\n")
-
-                for sector_num in sorted(self.sectors.keys()):
-                    sector_data = self.sectors[sector_num]
-                    # Show a preview of data, truncating if too long
-                    data_preview = (
-                        sector_data["data"][:8]
-                        if len(sector_data["data"]) > 8
-                        else sector_data["data"]
-                    )
-                    lba_display = (
-                        f"{sector_data['lba']:6d}"
-                        if sector_data["lba"] is not None
-                        else "   N/A"
-                    )
-                    f.write(
-                        f"|   {sector_num:2d}   | {lba_display} | {sector_data['type']:6s} | {data_preview:6s} |\n"
+        with self._file_lock:
+            self._pending_rows = []
+            self._needs_rewrite = False
+            # Build the whole file from the cached rows, then write it once
+            parts = [
+                self._header_bytes(),
+                _DRIVE_COUNTERS_TMPL % (len(self.sectors), self.next_physical_sector),
+                _BLOCK_DIAGRAM_HEADER,
+            ]
+            parts.extend([self._sector_row(sector_num) for sector_num in self.sectors])
+            parts.append(_TABLE_BORDER)
+            contents = b"".join(parts)
+            try:
+                self._rewrite_file(contents)
+                self._appends_since_rewrite = 0
+                self._rows_appendable = True
+            except FileNotFoundError:
+                # If the file disappears while active, mark the drive as failed
+                if self.is_active:
+                    logger.log(
+                        f"Drive {self.drive_id} file not found during update. Marking as failed.",
+                        "ERROR",
                     )
-
-                f.write("+--------+--------+--------+--------+\n")
-        except FileNotFoundError:
-            # If the file disappears while active, mark the drive as failed
-            if self.is_active:
-                logger.log(
-                    f"Drive {self.drive_id} file not found during update. Marking as failed.",
-                    "ERROR",
-                )
-                self.mark_failed()
-        except Exception as e:
-            logger.log(f"Error updating drive file {self.file_path}: {e}", "ERROR")
+                    self.mark_failed()
+            except Exception as e:
+                logger.log(f"Error updating drive file {self.file_path}: {e}", "ERROR")
 
 
 # ---------------------------------------------------------------------
@@ -257,24 +1013,49 @@ class RAIDArray:
     """
     Manages a collection of drives as a single logical unit according to
     a specified RAID level. Handles data distribution, rebuilds, and status.
+    `demo_delay` overrides DEMO_DELAY for this array; pass 0 to run without
+    the demo pauses (e.g. when using the class as a library).
     """
 
-    def __init__(self, raid_level: int):
+    def __init__(self, raid_level: int, demo_delay: Optional[float] = None):
         self.raid_level = raid_level
         self.drives: List[Drive] = []
         self.folder_path = f"raid_{raid_level}"
         self.rebuild_active = False
         self.rebuild_thread = None
         self.rebalance_active = False # New flag for rebalance operations
+        # Set by cleanup() to cut short any demo pause a worker is sleeping in
+        self._cancel = threading.Event()
         self.rebalance_thread = None
         self.current_logical_block_index = 0
+        self.demo_delay = DEMO_DELAY if demo_delay is None else demo_delay  # See _demo_pause()
         # Maps LBA to a dictionary of {drive_id: physical_sector_number}
         self.logical_to_physical_map: Dict[int, Dict[int, int]] = {}
 
         self.raid_signature = (
-            f"RAID-{raid_level}-{datetime.datetime.now().timestamp()}"
+            f"RAID-{raid_level}-{time.time()}"
         )
         self.config_file = os.path.join(self.folder_path, "raid_config.json")
+        # Cached result of the active_drives property and what it depends on
+        self._active_drives: List[Drive] = []
+        self._active_drives_key: Optional[tuple] = None
+        # Active drives of each RAID-50/60 subarray by first drive position,
+        # and what they depend on (see _active_subarray_drives)
+        self._active_subarrays: Dict[int, List[Drive]] = {}
+        self._active_subarrays_key: Optional[tuple] = None
+        # Drives by ID and the drive list it was built from (see drive_by_id)
+        self._drives_by_id: Dict[int, Drive] = {}
+        self._drives_by_id_key: Optional[tuple] = None
+        # Per-block write method for this RAID level, looked up once
+        self._writer = {
+            0: self._write_raid0,
+            1: self._write_raid1,
+            5: self._write_raid5,
+            6: self._write_raid6,
+            10: self._write_raid10,
+            50: self._write_raid50,
+            60: self._write_raid60,
+        }.get(raid_level)
 
         # Define configurations for different RAID levels
         self.raid_configs = {
@@ -306,6 +1087,11 @@ class RAIDArray:
                 "fault_tolerance": 4,
             },
         }
+        # Settings of this array's level, looked up once
+        config = self.raid_configs[raid_level]
+        self.raid_name: str = config["name"]
+        self.min_drives: int = config["min_drives"]
+        self.fault_tolerance: int = config["fault_tolerance"]
 
     def initialize_raid_structure(self, clear_existing: bool = True):
         """
@@ -314,7 +1100,7 @@ class RAIDArray:
         If `clear_existing` is True, any old configuration is removed.
         """
         logger.log(
-            f"Initializing {self.raid_configs[self.raid_level]['name']} structure (clear_existing={clear_existing})"
+            f"Initializing {self.raid_name} structure (clear_existing={clear_existing})"
         )
 
         if os.path.exists(self.folder_path):
@@ -330,8 +1116,9 @@ class RAIDArray:
                 self.folder_path, exist_ok=True
             )  # Ensure folder exists for fresh start
 
+            self._close_drives()
             self.drives = []  # Start with an empty drive list
-            min_drives = self.raid_configs[self.raid_level]["min_drives"]
+            min_drives = self.min_drives
             for i in range(min_drives):
                 self.add_drive(
                     initial_setup=True
@@ -340,7 +1127,7 @@ class RAIDArray:
             self.current_logical_block_index = 0
             self.logical_to_physical_map = {}
             # Generate a new signature for a freshly initialized RAID
-            self.raid_signature = f"RAID-{self.raid_level}-{datetime.datetime.now().timestamp()}"
+            self.raid_signature = f"RAID-{self.raid_level}-{time.time()}"
             self._save_config()  # Save the initial configuration
             logger.log(
                 f"RAID-{self.raid_level} initialized fresh with {len(self.drives)} drives"
@@ -361,7 +1148,10 @@ class RAIDArray:
                 )
 
     def _save_config(self):
-        """Saves the current RAID configuration to a JSON file."""
+        """
+        Saves the current RAID configuration to a JSON file. The file is
+        replaced atomically, so a crash mid-save leaves the previous one.
+        """
         config_data = {
             "raid_level": self.raid_level,
             "raid_signature": self.raid_signature,
@@ -382,12 +1172,29 @@ class RAIDArray:
                 for d in self.drives
             ],
         }
+        tmp_file = None
         try:
-            with open(self.config_file, "w") as f:
-                json.dump(config_data, f, indent=4)
-            logger.log(f"RAID configuration saved to {self.config_file}")
+            # Serialize in one go, then write a temporary file and rename it
+            # over the config so it is never seen half-written. Rebuild and
+            # rebalance threads save too, so each save gets its own temp file.
+            contents = json.dumps(config_data, indent=4)
+            fd, tmp_file = tempfile.mkstemp(
+                dir=self.folder_path,
+                prefix=os.path.basename(self.config_file) + ".",
+                suffix=".tmp",
+            )
+            os.fchmod(fd, 0o644)  # mkstemp creates it readable by the owner only
+            with open(fd, "w") as f:
+                f.write(contents)
+            os.replace(tmp_file, self.config_file)
+            logger.log(f"RAID configuration saved to {self.config_file}", "DEBUG")
         except Exception as e:
             logger.log(f"Error saving RAID configuration: {e}", "ERROR")
+            if tmp_file is not None:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
 
     def _load_config(self) -> bool:
         """
@@ -421,6 +1228,7 @@ class RAIDArray:
                 for lba, d_map in loaded_map.items()
             }
 
+            self._close_drives()
             self.drives = []  # Clear current drives list before populating
             for drive_info in config_data.get("drives", []):
                 drive_id = drive_info["id"]
@@ -441,7 +1249,7 @@ class RAIDArray:
                     )
                     new_drive.is_active = False
                     new_drive.metadata["status"] = "failed_file_missing"
-                    new_drive.sectors = {}  # No data to load if file is missing
+                    new_drive.sectors = SectorStore()  # No data to load if file is missing
                 elif (
                     new_drive.signature != drive_signature
                     and drive_status != "failed"
@@ -472,6 +1280,46 @@ class RAIDArray:
             logger.log(f"Error loading RAID configuration: {e}", "ERROR")
             return False
 
+    @property
+    def active_drives(self) -> List[Drive]:
+        """
+        The active drives, in array order. The list is only rebuilt after a
+        drive's is_active changes or the drive list itself changes, so it
+        must not be modified by callers.
+        """
+        key = (Drive._status_generation, id(self.drives), len(self.drives))
+        if key != self._active_drives_key:
+            self._active_drives = [d for d in self.drives if d.is_active]
+            self._active_drives_key = key
+        return self._active_drives
+
+    def _active_subarray_drives(self, first_drive: int, size: int) -> List[Drive]:
+        """
+        Returns the active drives of the RAID-50/60 subarray made of the
+        `size` drives starting at position `first_drive`. Cached the same
+        way as active_drives, so it must not be modified by callers.
+        """
+        key = (Drive._status_generation, id(self.drives), len(self.drives))
+        if key != self._active_subarrays_key:
+            self._active_subarrays = {}
+            self._active_subarrays_key = key
+        drives = self._active_subarrays.get(first_drive)
+        if drives is None:
+            drives = [d for d in self.drives[first_drive : first_drive + size] if d.is_active]
+            self._active_subarrays[first_drive] = drives
+        return drives
+
+    def drive_by_id(self, drive_id: int) -> Optional[Drive]:
+        """
+        Returns the drive with the given ID, or None if there is none. The
+        lookup table is rebuilt only when the drive list changes.
+        """
+        key = (id(self.drives), len(self.drives))
+        if key != self._drives_by_id_key:
+            self._drives_by_id = {d.drive_id: d for d in self.drives}
+            self._drives_by_id_key = key
+        return self._drives_by_id.get(drive_id)
+
     def add_drive(self, initial_setup: bool = False, existing_signature: Optional[str] = None):
         """
         Adds a new drive to the RAID array, assigning it the next available ID.
@@ -486,17 +1334,11 @@ class RAIDArray:
             print(f"\033[93mWARNING: Adding drives dynamically to RAID-{self.raid_level} is not supported in this demo.\033[0m")
             return None
 
-        # Find the next sequential drive_id, accounting for potential gaps
-        if not self.drives:
-            new_drive_id = 0
-        else:
-            existing_ids = sorted([d.drive_id for d in self.drives])
-            new_drive_id = 0
-            for i in existing_ids:
-                if i == new_drive_id:
-                    new_drive_id += 1
-                else:
-                    break  # Found a gap, use this ID
+        # Find the lowest unused drive_id, accounting for potential gaps
+        existing_ids = {d.drive_id for d in self.drives}
+        new_drive_id = 0
+        while new_drive_id in existing_ids:
+            new_drive_id += 1
 
         new_drive = Drive(new_drive_id, self.folder_path, signature=existing_signature)
         self.drives.append(new_drive)
@@ -553,8 +1395,8 @@ class RAIDArray:
         failed_drive_obj.mark_failed()  # Mark the drive as failed
         self._save_config()
 
-        active_drives_count = sum(1 for d in self.drives if d.is_active)
-        fault_tolerance = self.raid_configs[self.raid_level]["fault_tolerance"]
+        active_drives_count = len(self.active_drives)
+        fault_tolerance = self.fault_tolerance
 
         # Check if the RAID array can survive this failure based on its fault tolerance
         if active_drives_count < (len(self.drives) - fault_tolerance):
@@ -584,7 +1426,7 @@ class RAIDArray:
             print("2. Add *new replacement* drive and start rebuild")
             print("3. Do nothing for now")
 
-            choice = input("Enter your choice (1-3): ").strip()
+            choice = prompt_input("Enter your choice (1-3): ").strip()
 
             if choice == "1":
                 # Option to re-add the *same* physical drive if it was just disconnected
@@ -643,8 +1485,8 @@ class RAIDArray:
         logger.log(f"Writing data: '{data}' to RAID-{self.raid_level}")
 
         # Basic checks to prevent writes to severely degraded or failed arrays
-        active_drives_count = sum(1 for d in self.drives if d.is_active)
-        fault_tolerance = self.raid_configs[self.raid_level]["fault_tolerance"]
+        active_drives_count = len(self.active_drives)
+        fault_tolerance = self.fault_tolerance
         min_drives_for_write = (
             len(self.drives) - fault_tolerance
         )  # E.g., for RAID-0, this is len(drives)
@@ -670,32 +1512,28 @@ class RAIDArray:
             )
             return
 
+        writer = self._writer
+        first_lba = self.current_logical_block_index
+        unsaved = False  # Whether there are changes the config file doesn't have yet
         for char_data in data:
             current_lba = self.current_logical_block_index
             self.logical_to_physical_map[current_lba] = {}
+            unsaved = True
 
             try:
-                # Call the specific write method based on RAID level for each character (logical block)
-                if self.raid_level == 0:
-                    self._write_raid0(char_data, current_lba)
-                elif self.raid_level == 1:
-                    self._write_raid1(char_data, current_lba)
-                elif self.raid_level == 5:
-                    self._write_raid5(char_data, current_lba)
-                elif self.raid_level == 6:
-                    self._write_raid6(char_data, current_lba)
-                elif self.raid_level == 10:
-                    self._write_raid10(char_data, current_lba)
-                elif self.raid_level == 50:
-                    self._write_raid50(char_data, current_lba)
-                elif self.raid_level == 60:
-                    self._write_raid60(char_data, current_lba)
+                # Call the specific write method for this RAID level for each character (logical block)
+                if writer is not None:
+                    writer(char_data, current_lba)
 
                 self.current_logical_block_index += 1
-                self._save_config() # Save config after each LBA is written
-                logger.log(
-                    f"RAID-{self.raid_level} write operation completed for logical block {current_lba} (data: '{char_data}')"
-                )
+                if (self.current_logical_block_index - first_lba) % CONFIG_SAVE_INTERVAL == 0:
+                    self._save_config()  # Checkpoint long writes
+                    unsaved = False
+                if VERBOSE_LOG:
+                    logger.log(
+                        f"RAID-{self.raid_level} write operation completed for logical block {current_lba} (data: '{char_data}')",
+                        "DEBUG",
+                    )
             except Exception as e:
                 logger.log(
                     f"RAID-{self.raid_level} write failed for logical block {current_lba} (data: '{char_data}'): {e}",
@@ -706,14 +1544,18 @@ class RAIDArray:
                     del self.logical_to_physical_map[current_lba]
                 # Break the loop if an error occurs for one LBA
                 break
-        logger.log(f"Finished processing input string '{data}'. Next LBA will be {self.current_logical_block_index}")
+        if unsaved:
+            self._save_config()  # One save for all the blocks written above
+        logger.log(
+            f"Finished processing input string '{data}': wrote {self.current_logical_block_index - first_lba} logical blocks across {active_drives_count} active drives. Next LBA will be {self.current_logical_block_index}"
+        )
 
     def _write_raid0(self, data: str, lba: int):
         """
         Implements RAID-0 striping: data (a single logical block/char) is written to one active drive.
         No redundancy, so any drive failure means data loss.
         """
-        active_drives = [d for d in self.drives if d.is_active]
+        active_drives = self.active_drives
         if not active_drives:
             logger.log("No active drives available", "ERROR")
             raise Exception("No active drives for RAID-0 write")
@@ -737,33 +1579,32 @@ class RAIDArray:
             drive_to_write.mark_failed()
             self.logical_to_physical_map[lba][drive_to_write.drive_id] = -1 # Permanently failed block
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
     def _write_raid1(self, data: str, lba: int):
         """
         Implements RAID-1 mirroring: data (a single logical block/char) is written identically to all active drives.
         Provides high redundancy as long as at least one drive remains active.
         """
-        active_drives = [d for d in self.drives if d.is_active]
+        active_drives = self.active_drives
         if not active_drives:
             logger.log("No active drives available", "ERROR")
             raise Exception("No active drives for RAID-1 write")
 
         successful_writes = 0
+        lba_map = self.logical_to_physical_map[lba]  # Looked up once for all mirrors
         for drive in self.drives: # Write to all configured drives that are active
             if drive.is_active:
                 try:
                     physical_sector = drive.write_sector(data, "DATA", lba)
-                    self.logical_to_physical_map[lba][
-                        drive.drive_id
-                    ] = physical_sector
+                    lba_map[drive.drive_id] = physical_sector
                     successful_writes += 1
                 except Exception as e:
                     logger.log(f"\033[91mError writing to Drive {drive.drive_id}: {e}\033[0m", "ERROR")
                     drive.mark_failed()
-            time.sleep(0.05)
+            self._demo_pause()
 
-        if (successful_writes < len(self.drives) - self.raid_configs[self.raid_level]["fault_tolerance"]):
+        if (successful_writes < len(self.drives) - self.fault_tolerance):
             raise Exception("Not enough drives successfully written for RAID-1 fault tolerance")
 
 
@@ -772,8 +1613,8 @@ class RAIDArray:
         Implements RAID-5 striping with parity: data (a single logical block/char)
         is written to a data drive, and parity is calculated and written to a separate drive.
         """
-        active_drives = [d for d in self.drives if d.is_active]
-        if len(active_drives) < self.raid_configs[self.raid_level]["min_drives"]:
+        active_drives = self.active_drives
+        if len(active_drives) < self.min_drives:
             logger.log(
                 "RAID-5 requires at least 3 active drives to operate.", "ERROR"
             )
@@ -784,17 +1625,16 @@ class RAIDArray:
         parity_drive_active_index = lba % len(active_drives)
         parity_drive = active_drives[parity_drive_active_index]
 
-        # Get data drives for this stripe (all active drives except the parity drive)
-        data_drives_for_stripe = [
-            d for i, d in enumerate(active_drives) if i != parity_drive_active_index
-        ]
-        if not data_drives_for_stripe:
+        # Data drives for this stripe are all active drives except the parity drive
+        if len(active_drives) < 2:
             raise Exception("Not enough data drives for RAID-5 striping.")
         
         # In RAID-5, for a single LBA, one block is data and one is parity.
         # We need to pick one data drive to write this 'data' to.
         # Simple approach: use a round-robin for data drives (within the current stripe).
-        data_drive_for_this_lba = data_drives_for_stripe[lba % len(data_drives_for_stripe)]
+        data_drive_for_this_lba = active_drives[
+            _data_drive_index(lba, len(active_drives), (parity_drive_active_index,))
+        ]
 
         # Write data block
         try:
@@ -804,21 +1644,23 @@ class RAIDArray:
             logger.log(f"\033[91mError writing data to Drive {data_drive_for_this_lba.drive_id}: {e}\033[0m", "ERROR")
             data_drive_for_this_lba.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         parity_char = self._calculate_parity(data) # Parity for this *single* data block
 
         try:
             physical_sector = parity_drive.write_sector(parity_char, "PARITY", lba)
             self.logical_to_physical_map[lba][parity_drive.drive_id] = physical_sector
-            logger.log(
-                f"Parity '{parity_char}' calculated and stored on drive {parity_drive.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"Parity '{parity_char}' calculated and stored on drive {parity_drive.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(f"\033[91mError writing parity to Drive {parity_drive.drive_id}: {e}\033[0m", "ERROR")
             parity_drive.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
 
     def _write_raid6(self, data: str, lba: int):
@@ -827,8 +1669,8 @@ class RAIDArray:
         Data (a single logical block/char) is written to a data drive,
         and two parity blocks are calculated and written to separate drives.
         """
-        active_drives = [d for d in self.drives if d.is_active]
-        if len(active_drives) < self.raid_configs[self.raid_level]["min_drives"]:
+        active_drives = self.active_drives
+        if len(active_drives) < self.min_drives:
             logger.log(
                 "RAID-6 requires at least 4 active drives to operate.", "ERROR"
             )
@@ -843,17 +1685,15 @@ class RAIDArray:
         parity_drive_1 = active_drives[parity_drive_1_idx]
         parity_drive_2 = active_drives[parity_drive_2_idx]
 
-        # Get data drives for this stripe (all active drives except the two parity drives)
-        data_drives_for_stripe = [
-            d
-            for i, d in enumerate(active_drives)
-            if i not in [parity_drive_1_idx, parity_drive_2_idx]
-        ]
-        if not data_drives_for_stripe:
+        # Data drives for this stripe are all active drives except the two parity drives
+        parity_indices = tuple({parity_drive_1_idx, parity_drive_2_idx})
+        if len(active_drives) <= len(parity_indices):
             raise Exception("Not enough data drives for RAID-6 striping.")
 
         # In RAID-6, for a single LBA, one block is data, two are parity.
-        data_drive_for_this_lba = data_drives_for_stripe[lba % len(data_drives_for_stripe)]
+        data_drive_for_this_lba = active_drives[
+            _data_drive_index(lba, len(active_drives), parity_indices)
+        ]
 
         # Write data block
         try:
@@ -863,41 +1703,44 @@ class RAIDArray:
             logger.log(f"\033[91mError writing data to Drive {data_drive_for_this_lba.drive_id}: {e}\033[0m", "ERROR")
             data_drive_for_this_lba.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         # Calculate P parity (simple XOR) - for a single data block, P is just the data itself
         p_parity_char = self._calculate_parity(data)
 
-        # Calculate Q parity (simplified for demo, typically Reed-Solomon)
-        # For a single block, Q parity is derived from that single block's value and its position.
-        q_parity_val = ord(data) ^ (lba % 100) # Simplified Q parity example
-        q_parity_char = f"Q{q_parity_val % 1000:03d}"[:4]
+        # Calculate Q parity: a GF(2^8) (Reed-Solomon) syndrome of the block's
+        # value, with the block's position (LBA) as the coefficient exponent
+        q_parity_char = _q_parity(data, lba)
 
         # Write P parity
         try:
             physical_sector_p = parity_drive_1.write_sector(p_parity_char, "PARITY-P", lba)
             self.logical_to_physical_map[lba][parity_drive_1.drive_id] = physical_sector_p
-            logger.log(
-                f"P-Parity '{p_parity_char}' stored on drive {parity_drive_1.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"P-Parity '{p_parity_char}' stored on drive {parity_drive_1.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(f"\033[91mError writing P-parity to Drive {parity_drive_1.drive_id}: {e}\033[0m", "ERROR")
             parity_drive_1.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         # Write Q parity
         try:
             physical_sector_q = parity_drive_2.write_sector(q_parity_char, "PARITY-Q", lba)
             self.logical_to_physical_map[lba][parity_drive_2.drive_id] = physical_sector_q
-            logger.log(
-                f"Q-Parity '{q_parity_char}' stored on drive {parity_drive_2.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"Q-Parity '{q_parity_char}' stored on drive {parity_drive_2.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(f"\033[91mError writing Q-parity to Drive {parity_drive_2.drive_id}: {e}\033[0m", "ERROR")
             parity_drive_2.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
     def _write_raid10(self, data: str, lba: int):
         """
@@ -905,7 +1748,7 @@ class RAIDArray:
         written to a mirrored pair of drives, chosen by striping.
         """
         if (
-            len(self.drives) < self.raid_configs[self.raid_level]["min_drives"]
+            len(self.drives) < self.min_drives
             or len(self.drives) % 2 != 0
         ):
             logger.log(
@@ -929,25 +1772,25 @@ class RAIDArray:
         target_pair = mirrored_pairs[target_pair_index]
 
         successful_writes = 0
+        lba_map = self.logical_to_physical_map[lba]  # Looked up once for both mirrors
         for drive in target_pair:
             if drive.is_active:
                 try:
                     physical_sector = drive.write_sector(data, "DATA", lba)
-                    self.logical_to_physical_map[lba][
-                        drive.drive_id
-                    ] = physical_sector
+                    lba_map[drive.drive_id] = physical_sector
                     successful_writes += 1
                 except Exception as e:
                     logger.log(f"\033[91mError writing to Drive {drive.drive_id}: {e}\033[0m", "ERROR")
                     drive.mark_failed()
-            time.sleep(0.05)
+            self._demo_pause()
 
         if successful_writes == 0:
             raise Exception(
                 f"Failed to write logical block '{data}' to any drive in target mirrored pair for LBA {lba}."
             )
 
-        logger.log(f"RAID-10: Data '{data}' written to mirrored stripes for LBA {lba}")
+        if VERBOSE_LOG:
+            logger.log(f"RAID-10: Data '{data}' written to mirrored stripes for LBA {lba}", "DEBUG")
 
     def _write_raid50(self, data: str, lba: int):
         """
@@ -966,17 +1809,14 @@ class RAIDArray:
             raise Exception("Invalid number of drives for RAID-50.")
 
         num_subarrays = len(self.drives) // min_drives_for_subarray
-        subarrays: List[List[Drive]] = []
-        for i in range(0, len(self.drives), min_drives_for_subarray):
-            subarray_drives = self.drives[i : i + min_drives_for_subarray]
-            subarrays.append(subarray_drives)
 
-        # Determine which subarray this LBA (data block) will be written to by striping
+        # Determine which subarray this LBA (data block) will be written to by
+        # striping. Subarrays are consecutive runs of min_drives_for_subarray drives.
         target_subarray_index = lba % num_subarrays
-        target_subarray = subarrays[target_subarray_index]
+        first_drive = target_subarray_index * min_drives_for_subarray
 
         # Simulate a RAID-5 write operation *within* this target subarray for the current LBA
-        active_subarray_drives = [d for d in target_subarray if d.is_active]
+        active_subarray_drives = self._active_subarray_drives(first_drive, min_drives_for_subarray)
         if len(active_subarray_drives) < min_drives_for_subarray - self.raid_configs[5]['fault_tolerance']:
             logger.log(
                 f"RAID-50 Subarray {target_subarray_index} failed due to too many drive failures. Cannot write data.",
@@ -988,14 +1828,12 @@ class RAIDArray:
         parity_drive_subarray_index = lba % len(active_subarray_drives)
         parity_drive = active_subarray_drives[parity_drive_subarray_index]
 
-        data_drives_for_stripe = [
-            d
-            for idx, d in enumerate(active_subarray_drives)
-            if idx != parity_drive_subarray_index
-        ]
-        
         # Select one data drive within the subarray for this LBA
-        data_drive_for_this_lba = data_drives_for_stripe[lba % len(data_drives_for_stripe)]
+        data_drive_for_this_lba = active_subarray_drives[
+            _data_drive_index(
+                lba, len(active_subarray_drives), (parity_drive_subarray_index,)
+            )
+        ]
 
         # Write data block
         try:
@@ -1008,16 +1846,18 @@ class RAIDArray:
             )
             data_drive_for_this_lba.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         parity_char = self._calculate_parity(data) # Parity for this single block
 
         try:
             physical_sector_parity = parity_drive.write_sector(parity_char, "PARITY", lba)
             self.logical_to_physical_map[lba][parity_drive.drive_id] = physical_sector_parity
-            logger.log(
-                f"RAID-50 Subarray {target_subarray_index}: Parity '{parity_char}' stored on drive {parity_drive.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"RAID-50 Subarray {target_subarray_index}: Parity '{parity_char}' stored on drive {parity_drive.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(
                 f"\033[91mError writing parity to Drive {parity_drive.drive_id} in subarray {target_subarray_index}: {e}\033[0m",
@@ -1025,9 +1865,10 @@ class RAIDArray:
             )
             parity_drive.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
-        logger.log(f"RAID-50: Data '{data}' written to striped RAID-5 subarrays for LBA {lba}")
+        if VERBOSE_LOG:
+            logger.log(f"RAID-50: Data '{data}' written to striped RAID-5 subarrays for LBA {lba}", "DEBUG")
 
     def _write_raid60(self, data: str, lba: int):
         """
@@ -1046,17 +1887,14 @@ class RAIDArray:
             raise Exception("Invalid number of drives for RAID-60.")
 
         num_subarrays = len(self.drives) // min_drives_for_subarray
-        subarrays: List[List[Drive]] = []
-        for i in range(0, len(self.drives), min_drives_for_subarray):
-            subarray_drives = self.drives[i : i + min_drives_for_subarray]
-            subarrays.append(subarray_drives)
 
-        # Determine which subarray this LBA (data block) will be written to by striping
+        # Determine which subarray this LBA (data block) will be written to by
+        # striping. Subarrays are consecutive runs of min_drives_for_subarray drives.
         target_subarray_index = lba % num_subarrays
-        target_subarray = subarrays[target_subarray_index]
+        first_drive = target_subarray_index * min_drives_for_subarray
 
         # Simulate a RAID-6 write operation *within* this target subarray for the current LBA
-        active_subarray_drives = [d for d in target_subarray if d.is_active]
+        active_subarray_drives = self._active_subarray_drives(first_drive, min_drives_for_subarray)
         if len(active_subarray_drives) < min_drives_for_subarray - self.raid_configs[6]['fault_tolerance']:
             logger.log(
                 f"RAID-60 Subarray {target_subarray_index} failed due to too many drive failures. Cannot write data.",
@@ -1073,18 +1911,16 @@ class RAIDArray:
         parity_drive_1 = active_subarray_drives[parity_drive_1_idx]
         parity_drive_2 = active_subarray_drives[parity_drive_2_idx]
 
-        data_drives_for_stripe = [
-            d
-            for idx, d in enumerate(active_subarray_drives)
-            if idx not in [parity_drive_1_idx, parity_drive_2_idx]
-        ]
-        if not data_drives_for_stripe:
+        parity_indices = tuple({parity_drive_1_idx, parity_drive_2_idx})
+        if len(active_subarray_drives) <= len(parity_indices):
             raise Exception(
                 f"RAID-60 Subarray {target_subarray_index}: Not enough data drives for RAID-6 striping."
             )
 
         # Select one data drive within the subarray for this LBA
-        data_drive_for_this_lba = data_drives_for_stripe[lba % len(data_drives_for_stripe)]
+        data_drive_for_this_lba = active_subarray_drives[
+            _data_drive_index(lba, len(active_subarray_drives), parity_indices)
+        ]
 
         # Write data block
         try:
@@ -1097,22 +1933,23 @@ class RAIDArray:
             )
             data_drive_for_this_lba.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         # Calculate P parity
         p_parity_char = self._calculate_parity(data)
 
         # Calculate Q parity
-        q_parity_val = ord(data) ^ (lba % 100)
-        q_parity_char = f"Q{q_parity_val % 1000:03d}"[:4]
+        q_parity_char = _q_parity(data, lba)
 
         # Write P parity
         try:
             physical_sector_p = parity_drive_1.write_sector(p_parity_char, "PARITY-P", lba)
             self.logical_to_physical_map[lba][parity_drive_1.drive_id] = physical_sector_p
-            logger.log(
-                f"RAID-60 Subarray {target_subarray_index}: P-Parity '{p_parity_char}' stored on drive {parity_drive_1.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"RAID-60 Subarray {target_subarray_index}: P-Parity '{p_parity_char}' stored on drive {parity_drive_1.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(
                 f"\033[91mError writing P-parity to Drive {parity_drive_1.drive_id} in subarray {target_subarray_index}: {e}\033[0m",
@@ -1120,15 +1957,17 @@ class RAIDArray:
             )
             parity_drive_1.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
         # Write Q parity
         try:
             physical_sector_q = parity_drive_2.write_sector(q_parity_char, "PARITY-Q", lba)
             self.logical_to_physical_map[lba][parity_drive_2.drive_id] = physical_sector_q
-            logger.log(
-                f"RAID-60 Subarray {target_subarray_index}: Q-Parity '{q_parity_char}' stored on drive {parity_drive_2.drive_id}"
-            )
+            if VERBOSE_LOG:
+                logger.log(
+                    f"RAID-60 Subarray {target_subarray_index}: Q-Parity '{q_parity_char}' stored on drive {parity_drive_2.drive_id}",
+                    "DEBUG",
+                )
         except Exception as e:
             logger.log(
                 f"\033[91mError writing Q-parity to Drive {parity_drive_2.drive_id} in subarray {target_subarray_index}: {e}\033[0m",
@@ -1136,11 +1975,20 @@ class RAIDArray:
             )
             parity_drive_2.mark_failed()
             raise
-        time.sleep(0.05)
+        self._demo_pause()
 
-        logger.log(f"RAID-60: Data '{data}' written to striped RAID-6 subarrays for LBA {lba}")
+        if VERBOSE_LOG:
+            logger.log(f"RAID-60: Data '{data}' written to striped RAID-6 subarrays for LBA {lba}", "DEBUG")
 
 
+    def _demo_pause(self):
+        """
+        Pauses for demo_delay seconds so the demo can be followed live.
+        Returns right away once cleanup() has been called.
+        """
+        if self.demo_delay:
+            self._cancel.wait(self.demo_delay)
+
     def _calculate_parity(self, data: str) -> str:
         """
         Calculates a simple XOR parity for the given data string.
@@ -1149,15 +1997,10 @@ class RAIDArray:
         if not data:
             return "0000"
 
-        parity_val = 0
-        for char in data:
-            try:
-                parity_val ^= ord(char)  # XOR the ASCII values of characters
-            except TypeError:
-                logger.log(
-                    f"WARNING: Non-character data in parity calculation: '{char}'", "WARN"
-                )
-                pass
+        if len(data) == 1:
+            parity_val = ord(data)  # The usual case: one character per block
+        else:
+            parity_val = _xor_chars(data)  # XOR the ASCII values of characters
 
         parity_str = f"P{parity_val:03d}"[:4]  # Format as Pxxx
         return parity_str
@@ -1221,8 +2064,7 @@ class RAIDArray:
 
             # Clear and prepare the replacement drive if it's truly a *new* replacement
             if failed_logical_drive_position != replacement_drive_id:
-                replacement_drive_obj.sectors = {}
-                replacement_drive_obj.next_physical_sector = 0
+                replacement_drive_obj.clear_sectors()
 
             replacement_drive_obj.is_active = True
             replacement_drive_obj.metadata["status"] = "rebuilding"
@@ -1230,21 +2072,21 @@ class RAIDArray:
             logger.log(f"Drive {replacement_drive_id} set to 'rebuilding' status.")
         else:
             # Rebuilding a *newly added* drive (e.g., RAID-1 sync)
-            if replacement_drive_obj.is_active and replacement_drive_obj.metadata["used_sectors"] > 0:
+            if replacement_drive_obj.is_active and len(replacement_drive_obj.sectors) > 0:
                  logger.log(f"New drive {replacement_drive_id} already has data, assuming it's consistent for this demo.", "INFO")
                  replacement_drive_obj.metadata["status"] = "active"
                  replacement_drive_obj._update_file()
                  self._save_config()
                  return # No rebuild needed if new drive already has data (e.g. pre-filled)
             
-            replacement_drive_obj.sectors = {}
-            replacement_drive_obj.next_physical_sector = 0
+            replacement_drive_obj.clear_sectors()
             replacement_drive_obj.is_active = True
             replacement_drive_obj.metadata["status"] = "syncing"
             replacement_drive_obj._update_file()
             logger.log(f"New drive {replacement_drive_id} set to 'syncing' status for rebuild.")
 
         self.rebuild_active = True
+        self._cancel.clear()
         self.rebuild_thread = threading.Thread(
             target=self._rebuild_worker,
             args=(
@@ -1286,11 +2128,15 @@ class RAIDArray:
                 print("\033[92mRebuild/Sync completed: No data to transfer.\033[0m")
                 return
 
+            progress_every = max(1, total_logical_blocks // PROGRESS_LOG_STEPS)
+            # Drives RAID-1 can copy the block from, looked up once
+            mirror_drives = [d for d in self.drives if d.drive_id != replacement_drive_id]
+
             for lba in range(total_logical_blocks):
                 if not self.rebuild_active:
                     break  # Stop if rebuild is cancelled
 
-                time.sleep(0.05)  # Simulate rebuild effort
+                self._demo_pause()  # Simulate rebuild effort
 
                 physical_sector_map_for_lba = self.logical_to_physical_map.get(lba, {})
 
@@ -1319,18 +2165,19 @@ class RAIDArray:
                     
                     self.logical_to_physical_map[lba][replacement_drive_id] = -1 # Mark as lost
                     # And write to disk
-                    replacement_drive.write_to_specific_sector(
+                    if not replacement_drive.try_write_to_specific_sector(
                         target_physical_sector_on_replacement if not is_new_drive_add else replacement_drive.next_physical_sector,
                         rebuilt_data,
                         "PERM_LOST",
                         lba,
-                    )
+                    ):
+                        break  # Replacement drive failed, see below
                     continue
 
                 elif self.raid_level == 1:
                     # For RAID-1, find any active mirror drive and copy its data
-                    for drive in self.drives:
-                        if drive.is_active and drive.drive_id != replacement_drive_id:
+                    for drive in mirror_drives:
+                        if drive.is_active:
                             mirror_physical_sector = physical_sector_map_for_lba.get(
                                 drive.drive_id
                             )
@@ -1365,11 +2212,11 @@ class RAIDArray:
                         
                         p_sector = physical_sector_map_for_lba.get(d.drive_id)
                         if d.is_active and p_sector is not None and p_sector != -1 and p_sector in d.sectors:
-                            sector_info = d.sectors[p_sector]
+                            sector_data, sector_type, _ = d.sectors[p_sector]
                             if d.drive_id == conceptual_parity_drive_id_for_lba:
-                                if sector_info["type"] == "PARITY": collected_parity_block = sector_info["data"]
+                                if sector_type == "PARITY": collected_parity_block = sector_data
                             else:
-                                if sector_info["type"] == "DATA": collected_data_blocks.append(sector_info["data"])
+                                if sector_type == "DATA": collected_data_blocks.append(sector_data)
 
                     target_is_parity_drive = (replacement_drive_id == conceptual_parity_drive_id_for_lba)
 
@@ -1414,13 +2261,13 @@ class RAIDArray:
                         
                         p_sector = physical_sector_map_for_lba.get(d.drive_id)
                         if d.is_active and p_sector is not None and p_sector != -1 and p_sector in d.sectors:
-                            sector_info = d.sectors[p_sector]
+                            sector_data, sector_type, _ = d.sectors[p_sector]
                             if d.drive_id == conceptual_p_drive_id_for_lba:
-                                if sector_info["type"] == "PARITY-P": collected_p_parity_block = sector_info["data"]
+                                if sector_type == "PARITY-P": collected_p_parity_block = sector_data
                             elif d.drive_id == conceptual_q_drive_id_for_lba:
-                                if sector_info["type"] == "PARITY-Q": collected_q_parity_block = sector_info["data"]
+                                if sector_type == "PARITY-Q": collected_q_parity_block = sector_data
                             else:
-                                if sector_info["type"] == "DATA": collected_data_blocks.append(sector_info["data"])
+                                if sector_type == "DATA": collected_data_blocks.append(sector_data)
 
                     target_is_p_drive = (replacement_drive_id == conceptual_p_drive_id_for_lba)
                     target_is_q_drive = (replacement_drive_id == conceptual_q_drive_id_for_lba)
@@ -1433,9 +2280,7 @@ class RAIDArray:
                             data_val = ord(collected_data_blocks[0])
                             rebuilt_data = chr((p_val ^ data_val) % 128)
                         elif collected_q_parity_block and collected_data_blocks:
-                            q_val = int(collected_q_parity_block[1:])
-                            data_val = ord(collected_data_blocks[0])
-                            rebuilt_data = chr((q_val ^ (lba % 100)) % 128)
+                            rebuilt_data = _q_recover(collected_q_parity_block, lba)
                         elif collected_p_parity_block and collected_q_parity_block:
                             rebuilt_data = chr(int(collected_p_parity_block[1:]) % 128)
                         else:
@@ -1447,8 +2292,7 @@ class RAIDArray:
 
                     elif target_is_q_drive:
                         if collected_data_blocks:
-                            q_recalc_val = ord(collected_data_blocks[0]) ^ (lba % 100)
-                            rebuilt_data = f"Q{q_recalc_val % 1000:03d}"[:4]
+                            rebuilt_data = _q_parity(collected_data_blocks[0], lba)
                         else: rebuilt_data = "???"
 
                     if rebuilt_data is None:
@@ -1506,7 +2350,7 @@ class RAIDArray:
                     conceptual_subarray_parity_drive_id_for_lba = self.drives[subarray_start_id + (lba % min_drives_for_subarray)].drive_id
 
                     for drive_id_in_subarray in range(subarray_start_id, subarray_start_id + min_drives_for_subarray):
-                        d = next((drv for drv in self.drives if drv.drive_id == drive_id_in_subarray), None)
+                        d = self.drive_by_id(drive_id_in_subarray)
                         if d is None: continue
                         
                         if d.drive_id == replacement_drive_id or (not is_new_drive_add and d.drive_id == failed_logical_drive_position):
@@ -1514,11 +2358,11 @@ class RAIDArray:
 
                         p_sector = physical_sector_map_for_lba.get(d.drive_id)
                         if d.is_active and p_sector is not None and p_sector != -1 and p_sector in d.sectors:
-                            sector_info = d.sectors[p_sector]
+                            sector_data, sector_type, _ = d.sectors[p_sector]
                             if d.drive_id == conceptual_subarray_parity_drive_id_for_lba:
-                                if sector_info["type"] == "PARITY": collected_parity_block = sector_info["data"]
+                                if sector_type == "PARITY": collected_parity_block = sector_data
                             else:
-                                if sector_info["type"] == "DATA": collected_data_blocks.append(sector_info["data"])
+                                if sector_type == "DATA": collected_data_blocks.append(sector_data)
                     
                     target_is_subarray_parity_drive = (replacement_drive_id == conceptual_subarray_parity_drive_id_for_lba)
 
@@ -1555,7 +2399,7 @@ class RAIDArray:
                         conceptual_q_drive_id = self.drives[subarray_start_id + ((lba + 2) % min_drives_for_subarray)].drive_id # Shift to next unique index
 
                     for drive_id_in_subarray in range(subarray_start_id, subarray_start_id + min_drives_for_subarray):
-                        d = next((drv for drv in self.drives if drv.drive_id == drive_id_in_subarray), None)
+                        d = self.drive_by_id(drive_id_in_subarray)
                         if d is None: continue
 
                         if d.drive_id == replacement_drive_id or (not is_new_drive_add and d.drive_id == failed_logical_drive_position):
@@ -1563,13 +2407,13 @@ class RAIDArray:
 
                         p_sector = physical_sector_map_for_lba.get(d.drive_id)
                         if d.is_active and p_sector is not None and p_sector != -1 and p_sector in d.sectors:
-                            sector_info = d.sectors[p_sector]
+                            sector_data, sector_type, _ = d.sectors[p_sector]
                             if d.drive_id == conceptual_p_drive_id:
-                                if sector_info["type"] == "PARITY-P": collected_p_parity_block = sector_info["data"]
+                                if sector_type == "PARITY-P": collected_p_parity_block = sector_data
                             elif d.drive_id == conceptual_q_drive_id:
-                                if sector_info["type"] == "PARITY-Q": collected_q_parity_block = sector_info["data"]
+                                if sector_type == "PARITY-Q": collected_q_parity_block = sector_data
                             else:
-                                if sector_info["type"] == "DATA": collected_data_blocks.append(sector_info["data"])
+                                if sector_type == "DATA": collected_data_blocks.append(sector_data)
                         
                     target_is_p_drive = (replacement_drive_id == conceptual_p_drive_id)
                     target_is_q_drive = (replacement_drive_id == conceptual_q_drive_id)
@@ -1583,8 +2427,7 @@ class RAIDArray:
                         elif collected_p_parity_block and not collected_q_parity_block and not collected_data_blocks:
                             rebuilt_data = chr(int(collected_p_parity_block[1:]) % 128)
                         elif collected_q_parity_block and not collected_p_parity_block and not collected_data_blocks:
-                             q_val = int(collected_q_parity_block[1:])
-                             rebuilt_data = chr((q_val ^ (lba % 100)) % 128)
+                             rebuilt_data = _q_recover(collected_q_parity_block, lba)
                         else: rebuilt_data = "???"
 
                     elif target_is_p_drive:
@@ -1592,8 +2435,7 @@ class RAIDArray:
                         else: rebuilt_data = "???"
                     elif target_is_q_drive:
                         if collected_data_blocks:
-                            q_recalc_val = ord(collected_data_blocks[0]) ^ (lba % 100)
-                            rebuilt_data = f"Q{q_recalc_val % 1000:03d}"[:4]
+                            rebuilt_data = _q_parity(collected_data_blocks[0], lba)
                         else: rebuilt_data = "???"
 
                     if rebuilt_data is None:
@@ -1609,9 +2451,10 @@ class RAIDArray:
 
                     # Update the logical-to-physical map to point to the new drive's sector
                     self.logical_to_physical_map[lba][replacement_drive_id] = actual_physical_sector_to_write
-                    replacement_drive.write_to_specific_sector(
+                    if not replacement_drive.try_write_to_specific_sector(
                         actual_physical_sector_to_write, rebuilt_data, "REBUILT" if not is_new_drive_add else "SYNCED", lba
-                    )
+                    ):
+                        break  # Replacement drive failed, see below
                 else:
                     logger.log(
                         f"REBUILD ERROR: Failed to reconstruct data for LBA {lba} on failed logical position {failed_logical_drive_position}",
@@ -1619,13 +2462,20 @@ class RAIDArray:
                     )
                     self.logical_to_physical_map[lba][replacement_drive_id] = -1 # Mark as failed to rebuild
                     # Also write an error marker to the disk's file
-                    replacement_drive.write_to_specific_sector(
+                    if not replacement_drive.try_write_to_specific_sector(
                         target_physical_sector_on_replacement if not is_new_drive_add else replacement_drive.next_physical_sector,
                         "ERROR", "REBUILD-FAIL", lba
-                    )
+                    ):
+                        break  # Replacement drive failed, see below
+
+                if (lba + 1) % progress_every == 0 or lba + 1 == total_logical_blocks:
+                    progress = ((lba + 1) / total_logical_blocks) * 100
+                    logger.log(f"REBUILD: Progress {progress:.1f}% - Logical Block {lba}")
 
-                progress = ((lba + 1) / total_logical_blocks) * 100
-                logger.log(f"REBUILD: Progress {progress:.1f}% - Logical Block {lba}")
+            if not replacement_drive.is_active:
+                logger.log(f"REBUILD: Replacement drive {replacement_drive_id} failed, rebuild aborted", "ERROR")
+                print(f"\033[91mERROR: Rebuild aborted: replacement drive {replacement_drive_id} failed.\033[0m")
+                return
 
             replacement_drive.metadata["status"] = "active"
             replacement_drive._update_file()
@@ -1640,6 +2490,7 @@ class RAIDArray:
         finally:
             self.rebuild_active = False
             self.health_check()  # Run a health check after rebuild
+            logger.flush()  # Nothing else may log for a while
 
     def start_rebalance(self, new_drive_id: int):
         """
@@ -1657,6 +2508,7 @@ class RAIDArray:
             return
 
         self.rebalance_active = True
+        self._cancel.clear()
         self.rebalance_thread = threading.Thread(
             target=self._rebalance_worker, args=(new_drive_id,), daemon=True
         )
@@ -1678,8 +2530,7 @@ class RAIDArray:
             new_drive_obj.metadata["status"] = "rebalancing"
             new_drive_obj._update_file()
             # It also needs its sectors cleared, as it's a new drive being incorporated into existing data.
-            new_drive_obj.sectors = {}
-            new_drive_obj.next_physical_sector = 0
+            new_drive_obj.clear_sectors()
 
 
             # Store the old logical_to_physical_map before rebuilding it
@@ -1692,12 +2543,11 @@ class RAIDArray:
             # This is a bit aggressive but ensures we write fresh data.
             # A more nuanced approach would selectively delete. For demo, this works.
             # Store current sectors to clear them
-            old_sectors_per_drive: Dict[int, Dict[int, Dict[str, Any]]] = {}
+            old_sectors_per_drive: Dict[int, SectorStore] = {}
             for d in self.drives:
                 if d.is_active: # Only clear active drives' data, failed drives are ignored
-                    old_sectors_per_drive[d.drive_id] = dict(d.sectors) # Snapshot old sectors
-                    d.sectors = {} # Clear for fresh writes
-                    d.next_physical_sector = 0 # Reset physical sector counter for fresh writes
+                    old_sectors_per_drive[d.drive_id] = d.sectors # Keep old sectors
+                    d.clear_sectors() # Clear for fresh writes
                     d._update_file()
 
 
@@ -1710,15 +2560,17 @@ class RAIDArray:
                 print("\033[92mRebalance completed: No data to redistribute.\033[0m")
                 return
 
+            progress_every = max(1, total_logical_blocks // PROGRESS_LOG_STEPS)
+
             # Active drives list now includes the new drive
-            active_drives_for_rebalance = [d for d in self.drives if d.is_active]
+            active_drives_for_rebalance = self.active_drives
 
 
             for lba in range(total_logical_blocks):
                 if not self.rebalance_active:
                     break
 
-                time.sleep(0.05)
+                self._demo_pause()
 
                 original_data_for_lba = None
                 old_lba_map = old_logical_to_physical_map_snapshot.get(lba, {})
@@ -1736,7 +2588,7 @@ class RAIDArray:
                         if old_drive_id < len(self.drives):
                             old_drive_obj = self.drives[old_drive_id]
                             if old_drive_obj.is_active and old_p_sector != -1 and old_p_sector in old_sectors_per_drive.get(old_drive_id, {}):
-                                original_data_for_lba = old_sectors_per_drive[old_drive_id][old_p_sector]["data"]
+                                original_data_for_lba = old_sectors_per_drive[old_drive_id].data_of(old_p_sector)
                                 break
                 elif self.raid_level == 5:
                     # Reconstruct data for LBA from old sources
@@ -1753,13 +2605,13 @@ class RAIDArray:
                         if old_drive_id < len(self.drives):
                             old_drive_obj = self.drives[old_drive_id] # This is the object, active state
                             if old_drive_obj.is_active and old_p_sector != -1 and old_p_sector in old_sectors_per_drive.get(old_drive_id, {}):
-                                sector_info = old_sectors_per_drive[old_drive_id][old_p_sector]
-                                if sector_info["type"] == "DATA":
-                                    original_data_for_lba = sector_info["data"]
+                                sector_data, sector_type, _ = old_sectors_per_drive[old_drive_id][old_p_sector]
+                                if sector_type == "DATA":
+                                    original_data_for_lba = sector_data
                                     break
-                                elif sector_info["type"] == "PARITY" and not original_data_for_lba:
+                                elif sector_type == "PARITY" and not original_data_for_lba:
                                     # If no data found, and we find parity, we can reconstruct
-                                    original_data_for_lba = chr(int(sector_info["data"][1:]) % 128) # Pxxx -> char
+                                    original_data_for_lba = chr(int(sector_data[1:]) % 128) # Pxxx -> char
                                     
                 elif self.raid_level == 6:
                     # Reconstruct data for LBA from old sources (P or Q)
@@ -1771,22 +2623,21 @@ class RAIDArray:
                         if old_drive_id < len(self.drives):
                             old_drive_obj = self.drives[old_drive_id]
                             if old_drive_obj.is_active and old_p_sector != -1 and old_p_sector in old_sectors_per_drive.get(old_drive_id, {}):
-                                sector_info = old_sectors_per_drive[old_drive_id][old_p_sector]
-                                if sector_info["type"] == "DATA":
-                                    original_data_for_lba = sector_info["data"]
+                                sector_data, sector_type, _ = old_sectors_per_drive[old_drive_id][old_p_sector]
+                                if sector_type == "DATA":
+                                    original_data_for_lba = sector_data
                                     break
-                                elif sector_info["type"] == "PARITY-P" and not original_data_for_lba:
-                                    collected_old_p = sector_info["data"]
-                                elif sector_info["type"] == "PARITY-Q" and not original_data_for_lba:
-                                    collected_old_q = sector_info["data"]
+                                elif sector_type == "PARITY-P" and not original_data_for_lba:
+                                    collected_old_p = sector_data
+                                elif sector_type == "PARITY-Q" and not original_data_for_lba:
+                                    collected_old_q = sector_data
                     
                     if original_data_for_lba is None:
                         if collected_old_p:
                             original_data_for_lba = chr(int(collected_old_p[1:]) % 128) # Recover from P
                         elif collected_old_q:
                             # Reconstruct from Q (more complex for real RAID-6, simplify for demo)
-                            q_val = int(collected_old_q[1:])
-                            original_data_for_lba = chr((q_val ^ (lba % 100)) % 128)
+                            original_data_for_lba = _q_recover(collected_old_q, lba)
                         
                 if original_data_for_lba is None:
                     logger.log(f"REBALANCE WARN: Could not find original data for LBA {lba} during rebalance. Data permanently lost for this LBA.", "WARN")
@@ -1851,8 +2702,7 @@ class RAIDArray:
                         physical_sector_p = p_drive_obj.write_sector(p_parity_char, "PARITY-P", lba)
                         new_logical_to_physical_map_in_progress[lba][p_drive_obj.drive_id] = physical_sector_p
 
-                        q_parity_val = ord(original_data_for_lba) ^ (lba % 100)
-                        q_parity_char = f"Q{q_parity_val % 1000:03d}"[:4]
+                        q_parity_char = _q_parity(original_data_for_lba, lba)
                         physical_sector_q = q_drive_obj.write_sector(q_parity_char, "PARITY-Q", lba)
                         new_logical_to_physical_map_in_progress[lba][q_drive_obj.drive_id] = physical_sector_q
 
@@ -1863,8 +2713,9 @@ class RAIDArray:
                     logger.log(f"REBALANCE ERROR: Failed to re-write LBA {lba} to new stripe during rebalance: {e}", "ERROR")
                     self.logical_to_physical_map[lba] = {} # Mark as failed to rebalance
                 
-                progress = ((lba + 1) / total_logical_blocks) * 100
-                logger.log(f"REBALANCE: Progress {progress:.1f}% - Logical Block {lba}")
+                if (lba + 1) % progress_every == 0 or lba + 1 == total_logical_blocks:
+                    progress = ((lba + 1) / total_logical_blocks) * 100
+                    logger.log(f"REBALANCE: Progress {progress:.1f}% - Logical Block {lba}")
             
             # Final state update for all drives
             for d in self.drives:
@@ -1883,6 +2734,7 @@ class RAIDArray:
         finally:
             self.rebalance_active = False
             self.health_check()
+            logger.flush()  # Nothing else may log for a while
 
     def health_check(self):
         """
@@ -1895,8 +2747,8 @@ class RAIDArray:
         health_status = "OK"
 
         # 1. Check active drive count vs fault tolerance
-        active_drives_count = sum(1 for d in self.drives if d.is_active)
-        fault_tolerance = self.raid_configs[self.raid_level]["fault_tolerance"]
+        active_drives_count = len(self.active_drives)
+        fault_tolerance = self.fault_tolerance
 
         if active_drives_count < (len(self.drives) - fault_tolerance):
             print("\033[91mSTATUS: CRITICAL - RAID has failed beyond fault tolerance.\033[0m")
@@ -1942,7 +2794,7 @@ class RAIDArray:
             for d in self.drives:
                 p_sector = mapped_drives_for_lba.get(d.drive_id)
                 if d.is_active and p_sector is not None and p_sector != -1 and p_sector in d.sectors:
-                    available_sources.append((d.drive_id, d.sectors[p_sector].get("type")))
+                    available_sources.append((d.drive_id, d.sectors.type_of(p_sector)))
             
             num_available_sources = len(available_sources)
             # num_total_drives_in_array is problematic for LBA-specific checks in RAID0/5/6
@@ -2037,18 +2889,27 @@ class RAIDArray:
         Displays the current status of the RAID array, including drive states
         and logical-to-physical block mappings. Also triggers a health check.
         """
-        print(f"\n{'='*60}")
-        print(f"RAID-{self.raid_level} STATUS")
-        print(f"{'='*60}")
-        print(f"Configuration: {self.raid_configs[self.raid_level]['name']}")
-        print(f"RAID Signature: {self.raid_signature}")
-        print(f"Total Configured Drives: {len(self.drives)}")
-        print(f"Active Drives: {sum(1 for d in self.drives if d.is_active)}")
-        print(f"Failed Drives: {sum(1 for d in self.drives if not d.is_active)}")
-        print(f"Current Logical Block Index: {self.current_logical_block_index}")
-        print(f"Rebuild Active: {'Yes' if self.rebuild_active else 'No'}")
-        print(f"Rebalance Active: {'Yes' if self.rebalance_active else 'No'}") # New status
-        print()
+        # Bring the drive files in line with what is shown
+        for drive in self.drives:
+            drive.refresh_file()
+        drive_writer.flush()
+
+        # Collect the whole report and print it with a single call
+        active_count = len(self.active_drives)
+        lines = [
+            f"\n{'='*60}",
+            f"RAID-{self.raid_level} STATUS",
+            f"{'='*60}",
+            f"Configuration: {self.raid_name}",
+            f"RAID Signature: {self.raid_signature}",
+            f"Total Configured Drives: {len(self.drives)}",
+            f"Active Drives: {active_count}",
+            f"Failed Drives: {len(self.drives) - active_count}",
+            f"Current Logical Block Index: {self.current_logical_block_index}",
+            f"Rebuild Active: {'Yes' if self.rebuild_active else 'No'}",
+            f"Rebalance Active: {'Yes' if self.rebalance_active else 'No'}", # New status
+            "",
+        ]
 
         for drive in self.drives:
             status = drive.metadata["status"]
@@ -2061,20 +2922,21 @@ class RAIDArray:
             else:
                 status_display = f"\033[92m{status}\033[0m"
 
-            print(
+            lines.append(
                 f"Drive {drive.drive_id}: {status_display} - {drive.next_physical_sector} physical sectors written (Signature: {drive.signature})"
             )
 
-        print(f"\nLogical Block to Physical Sector Mapping:")
+        lines.append(f"\nLogical Block to Physical Sector Mapping:")
         if not self.logical_to_physical_map:
-            print("  No logical blocks written yet.")
+            lines.append("  No logical blocks written yet.")
         else:
             for lba in sorted(self.logical_to_physical_map.keys()):
                 drive_sector_map = self.logical_to_physical_map[lba]
                 sorted_drive_sector_map = {
                     d_id: drive_sector_map[d_id] for d_id in sorted(drive_sector_map.keys())
                 }
-                print(f"  LBA {lba}: {sorted_drive_sector_map}")
+                lines.append(f"  LBA {lba}: {sorted_drive_sector_map}")
+        print("\n".join(lines))
 
         # Run health check
         self.health_check()
@@ -2082,10 +2944,11 @@ class RAIDArray:
     def cleanup(self):
         """
         Cleans up resources, particularly stopping any active rebuild threads
-        to ensure a clean shutdown.
+        to ensure a clean shutdown, and closes the drive files.
         """
         self.rebuild_active = False
         self.rebalance_active = False # Ensure rebalance thread is also stopped
+        self._cancel.set()  # Wake the workers so they see the flags now
 
         if self.rebuild_thread and self.rebuild_thread.is_alive():
             logger.log("Waiting for rebuild thread to finish...", "INFO")
@@ -2099,12 +2962,30 @@ class RAIDArray:
             if self.rebalance_thread.is_alive():
                 logger.log("Rebalance thread did not terminate gracefully.", "WARN")
 
+        # The workers are done, so pauses of later writes wait again
+        self._cancel.clear()
+        self._close_drives()
+
+    def _close_drives(self):
+        """Closes the open drive files of all drives in the array."""
+        for drive in self.drives:
+            drive.close()
+
 
 # ---------------------------------------------------------------------
 # Interactive mode implementation
 # ---------------------------------------------------------------------
 
 
+def prompt_input(prompt: str = "") -> str:
+    """
+    Reads a line of user input, writing out any buffered log messages
+    first so they show up before the program blocks.
+    """
+    logger.flush()
+    return input(prompt)
+
+
 def interactive_mode(raid: RAIDArray):
     """
     Provides an interactive menu for users to perform various RAID operations
@@ -2123,10 +3004,10 @@ def interactive_mode(raid: RAIDArray):
         print("6. Exit RAID demo")
         print()
 
-        choice = input("Enter your choice (1-6): ").strip()
+        choice = prompt_input("Enter your choice (1-6): ").strip()
 
         if choice == "1":
-            data = input("Enter data to write: ")
+            data = prompt_input("Enter data to write: ")
             if data:
                 # Prevent writing during active rebuild/rebalance
                 if raid.rebuild_active or raid.rebalance_active:
@@ -2134,17 +3015,17 @@ def interactive_mode(raid: RAIDArray):
                 else:
                     raid.write_data(data)
                 print("Press Enter to continue...")
-                input()
+                prompt_input()
 
         elif choice == "2":
             raid.display_status()
             try:
-                drive_id_to_fail = int(input("Enter drive ID to simulate failure for: "))
+                drive_id_to_fail = int(prompt_input("Enter drive ID to simulate failure for: "))
                 raid.remove_drive(drive_id_to_fail)
             except ValueError:
                 print("\033[91mInvalid drive ID (must be a number).\033[0m")
             print("Press Enter to continue...")
-            input()
+            prompt_input()
 
         elif choice == "3":
             # Prevent adding drives for complex RAID levels dynamically in demo
@@ -2152,21 +3033,21 @@ def interactive_mode(raid: RAIDArray):
                 print(f"\033[93mAdding drives dynamically to RAID-{raid.raid_level} is not supported in this demo. "
                       "Please re-initialize the RAID array with more drives if you wish to expand.\033[0m")
                 print("Press Enter to continue...")
-                input()
+                prompt_input()
                 continue
             
             # Prevent adding drives during active rebuild/rebalance (to avoid race conditions/complexity)
             if raid.rebuild_active or raid.rebalance_active:
                 print("\033[93mWARNING: RAID operation (rebuild/rebalance) in progress. Cannot add drives now. Please wait.\033[0m")
                 print("Press Enter to continue...")
-                input()
+                prompt_input()
                 continue
 
 
             print("\nAdd Drive Options:")
             print("a. Add a brand NEW, empty drive")
             print("b. Attempt to re-add an EXISTING drive (e.g., if it was temporarily disconnected but still has its original data/signature)")
-            add_choice = input("Enter your choice (a/b): ").strip().lower()
+            add_choice = prompt_input("Enter your choice (a/b): ").strip().lower()
 
             if add_choice == 'a':
                 new_drive_id = raid.add_drive(initial_setup=False)
@@ -2175,8 +3056,8 @@ def interactive_mode(raid: RAIDArray):
                     pass 
             elif add_choice == 'b':
                 try:
-                    drive_id_to_readd = int(input("Enter the ID of the existing drive you want to re-add: "))
-                    existing_drive_match = next((d for d in raid.drives if d.drive_id == drive_id_to_readd), None)
+                    drive_id_to_readd = int(prompt_input("Enter the ID of the existing drive you want to re-add: "))
+                    existing_drive_match = raid.drive_by_id(drive_id_to_readd)
 
                     if existing_drive_match:
                         if existing_drive_match.is_active:
@@ -2206,21 +3087,21 @@ def interactive_mode(raid: RAIDArray):
                 print("\033[91mInvalid choice for adding drive.\033[0m")
 
             print("Press Enter to continue...")
-            input()
+            prompt_input()
 
         elif choice == "4":
             raid.display_status()
             print("\nDrive files and raid_config.json created in folder:", raid.folder_path)
             print("You can view these files to see detailed block layouts and RAID state.")
             print("Press Enter to continue...")
-            input()
+            prompt_input()
 
         elif choice == "5":
             print(
                 "\n\033[91mWARNING: This will DELETE the current RAID configuration and all simulated drive data!\033[0m"
             )
             confirm = (
-                input("Are you sure you want to clear the configuration? (y/n): ")
+                prompt_input("Are you sure you want to clear the configuration? (y/n): ")
                 .strip()
                 .lower()
             )
@@ -2234,7 +3115,7 @@ def interactive_mode(raid: RAIDArray):
             else:
                 print("Clear configuration cancelled.")
             print("Press Enter to continue...")
-            input()
+            prompt_input()
 
         elif choice == "6":
             break
@@ -2251,13 +3132,9 @@ def interactive_mode(raid: RAIDArray):
 
 def main():
     """
-    Main program entry point. Initializes logging, allows selection of RAID level,
+    Main program entry point. Allows selection of RAID level,
     and runs the interactive mode. Handles program shutdown gracefully.
     """
-    global logging_active
-    global logger
-    logger = Logger()  # Initialize the global logger
-
     print("\n" + "=" * 40)
     print("      RAID Array Simulator with Visualization      ")
     print("=" * 40)
@@ -2276,7 +3153,7 @@ def main():
             print("q - Quit")
 
             choice = (
-                input("\nEnter your choice (0, 1, 5, 6, 10, 50, 60, or q): ")
+                prompt_input("\nEnter your choice (0, 1, 5, 6, 10, 50, 60, or q): ")
                 .strip()
                 .lower()
             )
@@ -2295,7 +3172,7 @@ def main():
                     clear_on_next_init = True
                     if config_exists:
                         print(f"\nAn existing RAID-{raid_level} configuration was found in the '{raid_folder}' directory.")
-                        prompt = input(
+                        prompt = prompt_input(
                             "Do you want to wipe it clean and start fresh? (y/n, default 'n' will attempt to load it): "
                         ).strip().lower()
                         if prompt == "y":
@@ -2326,9 +3203,9 @@ def main():
         print("\n\nUser interrupted. Shutting down gracefully...")
 
     finally:
-        logging_active = False  # Signal the logging thread to stop
+        drive_writer.flush()  # Make sure all drive files are up to date
         logger.log("RAIDVIZ application shutting down.", "INFO")
-        time.sleep(0.5)  # Give the logging thread a moment to process remaining messages
+        logger.shutdown()  # Write out remaining messages and close the log file
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import unittest
+
+import raidvis
+
+
+class SectorStoreTest(unittest.TestCase):
+    def test_nul_bytes_are_kept(self):
+        store = raidvis.SectorStore()
+        store.store(0, "\0", "DATA", 1)
+        store.store(1, "ab\0", "DATA", 2)
+        store.store(2, "", "DATA", None)
+        self.assertEqual(store[0], ("\0", "DATA", 1))
+        self.assertEqual(store[1], ("ab\0", "DATA", 2))
+        self.assertEqual(store.data_of(2), "")
+
+
+if __name__ == "__main__":
+    unittest.main()